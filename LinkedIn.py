@@ -1,183 +1,305 @@
-# linkedin.py
-import argparse
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import time
-import logging
-import tkinter as tk
-from tkinter import messagebox
-import csv
-
-# Default config
-DEFAULT_QUERY = "Software Engineer"
-DEFAULT_LOCATION = "San Francisco, CA"
-LINKEDIN_URL = "https://www.linkedin.com/jobs"
-MAX_APPLICATIONS = 50
-CSV_FILENAME = "applied_jobs.csv"
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger("apply_50_jobs")
-
-def init_driver(headless=False):
-    chrome_options = Options()
-    if headless:
-        chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--start-maximized")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option("useAutomationExtension", False)
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    return driver
-
-def show_alert(title, message):
-    root = tk.Tk()
-    root.withdraw()
-    messagebox.showerror(title, message)
-    root.destroy()
-
-def wait_for_login(driver, timeout=300):
-    logger.info("Waiting for user to log in to LinkedIn...")
-    driver.get("https://www.linkedin.com/login")
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        if "feed" in driver.current_url:
-            logger.info("Login successful.")
-            return True
-        time.sleep(2)
-    logger.error("Login timeout reached. Please log in manually within the timeout window.")
-    show_alert("Login Timeout", "Login was not detected within the expected time.")
-    return False
-
-def search_jobs(driver, query, location):
-    driver.get(LINKEDIN_URL)
-    time.sleep(5)
-    try:
-        search_input = driver.find_element(By.CSS_SELECTOR, "input[aria-label='Search by title, skill, or company']")
-        location_input = driver.find_element(By.CSS_SELECTOR, "input[aria-label='City, state, or zip code']")
-
-        search_input.clear()
-        search_input.send_keys(query)
-
-        location_input.clear()
-        location_input.send_keys(location)
-        location_input.send_keys(Keys.RETURN)
-
-        logger.info("Search submitted successfully.")
-        time.sleep(5)
-
-        html = driver.page_source
-        return html
-    except Exception as e:
-        logger.error(f"Failed to search jobs: {e}")
-        show_alert("Search Error", "An error occurred while searching for jobs.")
-        return ""
-
-def parse_job_listings(html):
-    soup = BeautifulSoup(html, "html.parser")
-    job_cards = soup.find_all("li", class_="jobs-search-results__list-item")
-
-    jobs = []
-    seen_urls = set()
-    for card in job_cards:
-        try:
-            title_elem = card.find("span", class_="sr-only")
-            title = title_elem.get_text(strip=True) if title_elem else "N/A"
-
-            company_elem = card.find("a", class_="hidden-nested-link")
-            company = company_elem.get_text(strip=True) if company_elem else "N/A"
-
-            location_elem = card.find("span", class_="job-search-card__location")
-            location = location_elem.get_text(strip=True) if location_elem else "N/A"
-
-            job_url_elem = card.find("a", href=True)
-            job_url = "https://www.linkedin.com" + job_url_elem['href'] if job_url_elem else "N/A"
-
-            if job_url not in seen_urls:
-                seen_urls.add(job_url)
-                jobs.append({
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "url": job_url
-                })
-
-        except Exception as e:
-            logger.warning(f"Failed to parse a job card: {e}")
-
-    logger.info(f"Parsed {len(jobs)} unique job listings.")
-    return jobs
-
-def apply_to_single_job(driver, job):
-    try:
-        driver.get(job['url'])
-        time.sleep(3)
-        easy_apply_btn = driver.find_element(By.CSS_SELECTOR, "button.jobs-apply-button")
-        if "Easy Apply" in easy_apply_btn.text:
-            easy_apply_btn.click()
-            time.sleep(2)
-            submit_btn = driver.find_element(By.CSS_SELECTOR, "button[aria-label='Submit application']")
-            submit_btn.click()
-            time.sleep(2)
-            logger.info(f"Applied to {job['title']} at {job['company']}")
-            return True
-        else:
-            logger.info(f"No Easy Apply for {job['title']} at {job['company']}")
-            return False
-    except Exception as e:
-        logger.warning(f"Could not apply to {job['title']} at {job['company']}: {e}")
-        return False
-
-def save_to_csv(applied_jobs, filename):
-    try:
-        with open(filename, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=["title", "company", "location", "url"])
-            writer.writeheader()
-            for job in applied_jobs:
-                writer.writerow(job)
-        logger.info(f"Saved {len(applied_jobs)} applied jobs to {filename}.")
-    except Exception as e:
-        logger.error(f"Failed to write to CSV file: {e}")
-
-def apply_to_jobs(query, location, headless):
-    logger.info("Starting to apply to jobs")
-    driver = init_driver(headless=headless)
-
-    if not wait_for_login(driver):
-        driver.quit()
-        return
-
-    html = search_jobs(driver, query, location)
-    if html:
-        jobs = parse_job_listings(html)
-        applied = 0
-        applied_jobs = []
-        for job in jobs:
-            if applied >= MAX_APPLICATIONS:
-                break
-            success = apply_to_single_job(driver, job)
-            if success:
-                applied_jobs.append(job)
-                applied += 1
-        save_to_csv(applied_jobs, CSV_FILENAME)
-        logger.info(f"Finished. Applied to {applied} jobs.")
-    else:
-        logger.error("No job listings were found.")
-
-    driver.quit()
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="LinkedIn Job Apply Bot")
-    parser.add_argument("--query", type=str, default=DEFAULT_QUERY, help="Job title or keywords to search")
-    parser.add_argument("--location", type=str, default=DEFAULT_LOCATION, help="Location to search in")
-    parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
-    args = parser.parse_args()
-
-    apply_to_jobs(args.query, args.location, args.headless)
+# linkedin.py
+import argparse
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import logging
+import os
+from urllib.parse import urlencode
+from utils.storage import APPLIED_STATUSES, get_store
+from utils.models import Job
+from utils.results import get_results_sink
+from utils.browser import new_chrome
+from utils.sessions import get_session_pool
+from utils.pool import ApplyPool
+from utils.ratelimit import RateBudget
+from utils import ratelimit, waits
+from utils.parsing import CARD_SELECTOR, iter_cards, save_page
+from utils.extract import EXTRACT_MODE, extract_cards_in_browser
+from utils.dedupe import Deduper, canonical_url
+from utils.crawler import PageCrawler
+from utils.profiles import PROFILES_FILE, Profile, load_profiles
+from utils.metrics import metrics
+
+# Default config
+DEFAULT_QUERY = "Software Engineer"
+DEFAULT_LOCATION = "San Francisco, CA"
+LINKEDIN_URL = "https://www.linkedin.com/jobs"
+RESULTS_PER_PAGE = 25
+MAX_SEARCH_PAGES = int(os.getenv("MAX_SEARCH_PAGES", "10"))
+MAX_APPLICATIONS = 50
+CSV_FILENAME = "applied_jobs.csv"
+CSV_FIELDS = ["title", "company", "location", "url"]
+DEFAULT_WORKERS = int(os.getenv("APPLY_WORKERS", "3"))
+APPLY_RATE_PER_MINUTE = float(os.getenv("APPLY_RATE_PER_MINUTE", "12"))
+# Searches crawled side by side in batch mode, each on its own pooled browser
+BATCH_CRAWLERS = int(os.getenv("BATCH_CRAWLERS", "2"))
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("apply_50_jobs")
+
+def init_driver(headless=False, profile_dir=None):
+    return new_chrome(headless=headless, fast=headless, profile_dir=profile_dir, arguments=["--start-maximized"], stealth=True)
+
+# tkinter is only loaded when an alert is shown; without a display the alert is just logged
+def show_alert(title, message):
+    try:
+        import tkinter as tk
+        from tkinter import messagebox
+        root = tk.Tk()
+    except Exception as e:
+        logger.warning(f"{title}: {message} (alert not shown: {e})")
+        return
+    root.withdraw()
+    messagebox.showerror(title, message)
+    root.destroy()
+
+def wait_for_login(driver, timeout=300):
+    logger.info("Waiting for user to log in to LinkedIn...")
+    waits.open_page(driver, "https://www.linkedin.com/login")
+    try:
+        waits.wait_url_contains(driver, "feed", timeout=timeout)
+        logger.info("Login successful.")
+        return True
+    except TimeoutException:
+        pass
+    logger.error("Login timeout reached. Please log in manually within the timeout window.")
+    show_alert("Login Timeout", "Login was not detected within the expected time.")
+    return False
+
+# Submit the search and wait for the first result card; returns False if the search failed
+def submit_search(driver, query, location):
+    waits.open_page(driver, LINKEDIN_URL)
+    try:
+        search_input = waits.wait_present(driver, (By.CSS_SELECTOR, "input[aria-label='Search by title, skill, or company']"))
+        location_input = driver.find_element(By.CSS_SELECTOR, "input[aria-label='City, state, or zip code']")
+
+        search_input.clear()
+        search_input.send_keys(query)
+
+        location_input.clear()
+        location_input.send_keys(location)
+        location_input.send_keys(Keys.RETURN)
+
+        logger.info("Search submitted successfully.")
+        try:
+            waits.wait_present(driver, (By.CSS_SELECTOR, "li.jobs-search-results__list-item"))
+        except TimeoutException:
+            logger.warning("No job results appeared before the wait timed out.")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to search jobs: {e}")
+        show_alert("Search Error", "An error occurred while searching for jobs.")
+        return False
+
+def search_jobs(driver, query, location):
+    if not submit_search(driver, query, location):
+        return ""
+    html = driver.page_source
+    save_page(html, "linkedin")
+    return html
+
+CARD_FIELDS = {
+    "title": ("span.sr-only", None),
+    "company": ("a.hidden-nested-link", None),
+    "location": ("span.job-search-card__location", None),
+    "href": ("a[href]", "href"),
+}
+
+def job_listings(cards):
+    jobs = []
+    seen_urls = set()
+    for card in cards:
+        try:
+            title = card["title"] or "N/A"
+            company = card["company"] or "N/A"
+            location = card["location"] or "N/A"
+            job_url = "https://www.linkedin.com" + card["href"] if card["href"] else "N/A"
+
+            url_key = canonical_url(job_url) or job_url
+            if url_key not in seen_urls:
+                seen_urls.add(url_key)
+                jobs.append(Job(title, job_url, "LinkedIn", company=company, location=location))
+
+        except Exception as e:
+            logger.warning(f"Failed to parse a job card: {e}")
+
+    logger.info(f"Parsed {len(jobs)} unique job listings.")
+    return jobs
+
+def parse_job_listings(html):
+    return job_listings(iter_cards(html, CARD_FIELDS))
+
+# Deep link to the results for a search; later pages add a start= offset
+def search_url(query, location):
+    return f"{LINKEDIN_URL}/search/?{urlencode({'keywords': query, 'location': location})}"
+
+# Read the result cards of the page the browser is on; in "browser" mode all cards come back from one script call
+def page_job_listings(driver):
+    if EXTRACT_MODE == "browser":
+        return job_listings(extract_cards_in_browser(driver, CARD_FIELDS))
+    html = driver.page_source
+    save_page(html, "linkedin")
+    return parse_job_listings(html)
+
+# Crawl up to max_pages result pages in the background; iterate it for (page, jobs)
+def crawl_job_listings(driver, query, location, max_pages=MAX_SEARCH_PAGES):
+    return PageCrawler(driver, search_url(query, location), page_job_listings, CARD_SELECTOR,
+                       page_size=RESULTS_PER_PAGE, max_pages=max_pages)
+
+def collect_job_listings(driver, query, location, max_pages=MAX_SEARCH_PAGES):
+    with crawl_job_listings(driver, query, location, max_pages) as crawler:
+        return [job for _, jobs in crawler for job in jobs]
+
+# Round-robin over the profiles' result pages, `concurrent` crawls at a time, yielding
+# (profile, page, jobs). Each crawl loads its next page in the background on a driver from the
+# shared pool while the others are consumed; a finished crawl hands its driver to the next profile.
+def interleave_crawls(sessions, profiles, concurrent=BATCH_CRAWLERS):
+    waiting = list(profiles)
+    active = []
+    try:
+        while waiting or active:
+            while waiting and len(active) < max(1, concurrent):
+                profile = waiting.pop(0)
+                driver = sessions.acquire()
+                logger.info(f"Searching {profile.name}: {profile.query!r} in {profile.location or 'any location'}")
+                crawler = crawl_job_listings(driver, profile.query, profile.location)
+                active.append((profile, driver, crawler, iter(crawler)))
+            for entry in list(active):
+                profile, driver, crawler, pages = entry
+                try:
+                    page, jobs = next(pages)
+                except StopIteration:
+                    pass
+                except Exception as e:
+                    logger.error(f"Search for {profile.name} stopped early: {e}")
+                else:
+                    yield profile, page, jobs
+                    continue
+                active.remove(entry)
+                crawler.stop()
+                sessions.release(driver)
+    finally:
+        for profile, driver, crawler, _ in active:
+            crawler.stop()
+            sessions.release(driver)
+
+def apply_to_single_job(driver, job):
+    try:
+        waits.open_page(driver, job.url)
+        easy_apply_btn = waits.wait_clickable(driver, (By.CSS_SELECTOR, "button.jobs-apply-button"))
+        if "Easy Apply" in easy_apply_btn.text:
+            waits.pacing.pause()
+            easy_apply_btn.click()
+            waits.click(driver, (By.CSS_SELECTOR, "button[aria-label='Submit application']"))
+            waits.wait_for(driver, EC.invisibility_of_element_located((By.CSS_SELECTOR, "button[aria-label='Submit application']")))
+            logger.info(f"Applied to {job.title} at {job.company}")
+            return True
+        else:
+            logger.info(f"No Easy Apply for {job.title} at {job.company}")
+            return False
+    except Exception as e:
+        logger.warning(f"Could not apply to {job.title} at {job.company}: {e}")
+        return False
+
+# Applied jobs are appended to the CSV as each application succeeds, so a crash keeps them
+def applied_jobs_sink(filename=CSV_FILENAME):
+    return get_results_sink(filename, CSV_FIELDS)
+
+def apply_to_jobs(query, location, headless, workers=DEFAULT_WORKERS, max_applications=MAX_APPLICATIONS):
+    apply_to_profiles([Profile("search", query, location)], headless, workers, crawlers=1,
+                      max_applications=max_applications)
+
+# Batch mode: every profile's search runs in this one process, sharing the logged-in browser
+# pool, the job store and the dedupe state, so a job found by several searches is applied to
+# once and the whole sweep costs one Chrome startup and login. max_applications covers the batch.
+def apply_to_profiles(profiles, headless, workers=DEFAULT_WORKERS, crawlers=BATCH_CRAWLERS,
+                      max_applications=MAX_APPLICATIONS):
+    profiles = [profile for profile in profiles if profile.uses("LinkedIn")]
+    if not profiles:
+        logger.error("No profiles search LinkedIn.")
+        return
+    crawlers = max(1, min(crawlers, len(profiles)))
+    logger.info(f"Starting to apply to jobs for {len(profiles)} search(es)")
+    waits.stats.reset()
+    sessions = get_session_pool(
+        "linkedin", wait_for_login, size=workers + crawlers,
+        driver_factory=lambda profile_dir: init_driver(headless=headless, profile_dir=profile_dir),
+    )
+    # Log in once up front; every crawl and worker after this reuses the saved session
+    try:
+        sessions.release(sessions.acquire())
+    except RuntimeError as e:
+        logger.error(f"Could not start a logged-in session: {e}")
+        return
+
+    store = get_store()
+    sink = applied_jobs_sink()
+
+    def record(job, success):
+        store.set_status(job, "applied" if success else "failed")
+        if success:
+            sink.write(job)
+
+    # The crawlers keep their search drivers and load the next result pages while the workers apply
+    found = applied = 0
+    found_by_profile = dict.fromkeys((profile.name for profile in profiles), 0)
+    # Only jobs already applied to block a repost; stored jobs that are new or failed get (re)tried
+    deduper = Deduper.from_store(store, statuses=APPLIED_STATUSES)
+    budget = RateBudget(APPLY_RATE_PER_MINUTE, burst=workers)
+    crawls = interleave_crawls(sessions, profiles, crawlers)
+    try:
+        with ApplyPool(None, apply_to_single_job, workers=workers, budget=budget, on_result=record, sessions=sessions) as pool:
+            for profile, page, jobs in crawls:
+                found += len(jobs)
+                found_by_profile[profile.name] += len(jobs)
+                jobs, _ = deduper.dedupe(jobs)
+                store.upsert_many(jobs)
+                pending = store.not_applied(jobs)
+                if len(pending) < len(jobs):
+                    logger.info(f"Skipping {len(jobs) - len(pending)} job(s) already applied to.")
+                logger.info(f"Applying to {len(pending)} job(s) from {profile.name} results page {page}.")
+
+                results = pool.run(pending, limit=max_applications - applied)
+                applied += sum(1 for _, success in results if success)
+                sink.checkpoint()
+                if applied >= max_applications:
+                    break
+    except Exception as e:
+        logger.error(f"Search stopped early: {e}")
+    finally:
+        crawls.close()
+
+    if found:
+        if len(profiles) > 1:
+            logger.info("Found per search: " + ", ".join(f"{name} {count}" for name, count in found_by_profile.items()))
+        logger.info(f"Saved {applied} applied jobs to {CSV_FILENAME}.")
+        logger.info(f"Finished. Applied to {applied} jobs.")
+    else:
+        logger.error("No job listings were found.")
+
+    waits.stats.report(logger)
+    logger.info(ratelimit.summary())
+    metrics.report(logger)
+    sessions.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LinkedIn Job Apply Bot")
+    parser.add_argument("--query", type=str, default=DEFAULT_QUERY, help="Job title or keywords to search")
+    parser.add_argument("--location", type=str, default=DEFAULT_LOCATION, help="Location to search in")
+    parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of parallel browser sessions used to apply")
+    parser.add_argument("--profiles", nargs="?", const=PROFILES_FILE, default=None,
+                        help=f"Batch mode: run every search in a profile file (default {PROFILES_FILE}) in this one process")
+    parser.add_argument("--crawlers", type=int, default=BATCH_CRAWLERS, help="Searches crawled at the same time in batch mode")
+    parser.add_argument("--max-applications", type=int, default=MAX_APPLICATIONS, help="Stop after this many applications")
+    args = parser.parse_args()
+
+    if args.profiles and not os.path.exists(args.profiles):
+        parser.error(f"Profile file not found: {args.profiles}")
+    if args.profiles:
+        apply_to_profiles(load_profiles(args.profiles), args.headless, args.workers, args.crawlers, args.max_applications)
+    else:
+        apply_to_jobs(args.query, args.location, args.headless, args.workers, args.max_applications)
@@ -0,0 +1,59 @@
+# benchmarks/filter_benchmark.py
+#
+# Jobs filtered per second by the compiled keyword filter against the old
+# any(kw.lower() in title ...) scan, over a synthetic backlog:
+#
+#     python benchmarks/filter_benchmark.py --jobs 100000 --keywords 200
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.filters import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, JobFilter
+
+WORDS = "python java go rust senior junior engineer developer lead data entry level staff remote backend frontend".split()
+
+
+def baseline(jobs, include, exclude):
+    filtered = []
+    for job in jobs:
+        title = job[0].lower()
+        if (any(kw.lower() in title for kw in include) and
+                not any(kw.lower() in title for kw in exclude)):
+            filtered.append(job)
+    return filtered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled job filter")
+    parser.add_argument("--jobs", type=int, default=100000, help="Synthetic jobs to filter")
+    parser.add_argument("--keywords", type=int, default=0, help="Extra include keywords on top of the defaults")
+    args = parser.parse_args()
+
+    random.seed(0)
+    jobs = [(" ".join(random.choices(WORDS, k=6)), f"https://example.com/{n}", "LinkedIn") for n in range(args.jobs)]
+    include = DEFAULT_INCLUDE + [f"keyword{n}" for n in range(args.keywords)]
+    exclude = [kw.rstrip("*") for kw in DEFAULT_EXCLUDE]
+    print(f"{len(jobs)} jobs, {len(include)} include and {len(exclude)} exclude keywords")
+
+    started = time.perf_counter()
+    job_filter = JobFilter(include, DEFAULT_EXCLUDE)
+    compiled = time.perf_counter() - started
+    runs = [
+        ("substring scan (baseline)", lambda: baseline(jobs, include, exclude)),
+        ("compiled filter", lambda: job_filter.filter(jobs)),
+        ("compiled filter, ranked", lambda: job_filter.rank(jobs)),
+    ]
+    print(f"{'compile':<28} {compiled:>7.3f}s")
+    for label, run in runs:
+        started = time.perf_counter()
+        kept = len(run())
+        elapsed = time.perf_counter() - started
+        print(f"{label:<28} {elapsed:>7.3f}s  {kept:>7} kept  {len(jobs) / elapsed:>10.0f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/parse_benchmark.py
+#
+# Cards parsed per second for each HTML parser backend over saved result pages.
+# Save pages during normal runs with SAVE_RESULT_PAGES_DIR=data/pages, then:
+#
+#     python benchmarks/parse_benchmark.py data/pages/*.html
+#
+# With no pages given, a synthetic results page is generated instead.
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.parsing import CARD_SELECTOR, available_backends, extract_cards
+
+FIELDS = {
+    "title": ("span.sr-only", None),
+    "company": ("a.hidden-nested-link", None),
+    "location": ("span.job-search-card__location", None),
+    "href": ("a[href]", "href"),
+}
+
+
+def synthetic_page(cards=500):
+    card = (
+        '<li class="jobs-search-results__list-item"><div class="base-card">'
+        '<a class="base-card__full-link" href="/jobs/view/{n}/"><span class="sr-only">Python Developer {n}</span></a>'
+        '<h4><a class="hidden-nested-link" href="/company/{n}/">Company {n}</a></h4>'
+        '<span class="job-search-card__location">Remote</span>'
+        '<time datetime="2024-01-01">1 day ago</time></div></li>'
+    )
+    filler = '<div class="nav"><ul>' + "<li><a href='/x'>Link</a></li>" * 50 + "</ul></div>"
+    body = "".join(card.format(n=n) for n in range(cards))
+    return f"<html><head><title>Jobs</title></head><body>{filler * 20}<ul>{body}</ul>{filler * 20}</body></html>"
+
+
+# The parse used before the backends existed: full html.parser tree, then find_all
+def baseline(html):
+    from bs4 import BeautifulSoup
+
+    tag, _, css_class = CARD_SELECTOR.partition(".")
+    soup = BeautifulSoup(html, "html.parser")
+    jobs = []
+    for card in soup.find_all(tag, class_=css_class):
+        jobs.append({key: card.select_one(selector) for key, (selector, _) in FIELDS.items()})
+    return jobs
+
+
+def measure(parse, pages, repeat):
+    cards = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            cards += len(parse(html))
+    elapsed = time.perf_counter() - started
+    return cards, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job-card extraction per parser backend")
+    parser.add_argument("pages", nargs="*", help="Saved result pages (globs allowed)")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the page set")
+    parser.add_argument("--synthetic-cards", type=int, default=500, help="Cards in the generated page when no pages are given")
+    args = parser.parse_args()
+
+    paths = [path for pattern in args.pages for path in glob.glob(pattern)]
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                pages.append(f.read())
+        print(f"{len(pages)} saved page(s), {sum(len(p) for p in pages) / 1024:.0f} KiB")
+    else:
+        pages = [synthetic_page(args.synthetic_cards)]
+        print(f"Synthetic page with {args.synthetic_cards} cards, {len(pages[0]) / 1024:.0f} KiB")
+
+    runs = [("html.parser (full tree, baseline)", baseline)]
+    for backend in available_backends():
+        runs.append((f"{backend} (card subtrees only)", lambda html, b=backend: extract_cards(html, FIELDS, backend=b)))
+
+    for label, parse in runs:
+        cards, elapsed = measure(parse, pages, args.repeat)
+        rate = cards / elapsed if elapsed else float("inf")
+        print(f"{label:<40} {cards:>7} cards  {elapsed:>7.3f}s  {rate:>10.0f} cards/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,36 @@
-import sys
-from scripts import (
-    search_jobs,
-    update_apply_email,
-    apply_to_jobs,
-    deduplicate_jobs,
-    generate_cover_letters  # <- make sure this line is here
-)
-
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python cli.py [command]")
-        print("Commands: search_jobs, update_apply_email, deduplicate_jobs, apply_to_jobs, generate_cover_letters")
-        return
-
-    cmd = sys.argv[1]
-
-    if cmd == "search_jobs":
-        search_jobs.run()
-    elif cmd == "update_apply_email":
-        update_apply_email.run()
-    elif cmd == "deduplicate_jobs":
-        deduplicate_jobs.run()
-    elif cmd == "apply_to_jobs":
-        apply_to_jobs.run()
-    elif cmd == "generate_cover_letters":
-        generate_cover_letters.run()
-    else:
-        print(f"Unknown command: {cmd}")
-
-if __name__ == "__main__":
-    main()
+import importlib
+import sys
+
+# Each command's module is only imported when that command runs, so light commands
+# never pay for Selenium, pandas or a display
+COMMANDS = {
+    "search_jobs": "searchjobs",
+    "update_apply_email": "scripts.update_apply_email",
+    "deduplicate_jobs": "scripts.deduplicate_jobs",
+    "apply_to_jobs": "scripts.apply_to_jobs",
+    "generate_cover_letters": "scripts.generate_cover_letters",
+}
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python cli.py [command]")
+        print(f"Commands: {', '.join(COMMANDS)}")
+        return
+
+    cmd = sys.argv[1]
+
+    if cmd not in COMMANDS:
+        print(f"Unknown command: {cmd}")
+        return
+
+    try:
+        module = importlib.import_module(COMMANDS[cmd])
+    except ModuleNotFoundError as e:
+        if not (COMMANDS[cmd] == e.name or COMMANDS[cmd].startswith(f"{e.name}.")):
+            raise
+        print(f"Command {cmd} is not available: module {COMMANDS[cmd]} was not found")
+        return
+    module.run()
+
+if __name__ == "__main__":
+    main()
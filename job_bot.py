@@ -1,15 +1,20 @@
 import os
-import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
 from dotenv import load_dotenv
-import smtplib
-from email.mime.text import MIMEText
+from utils.storage import get_store
+from utils.models import Job
+from utils import waits
+from utils.metrics import metrics
+from utils.parsing import extract_cards, save_page
+from utils.extract import EXTRACT_MODE, extract_cards_in_browser
+from utils.listings import DISCOVERY_MODE, fetch_linkedin_listings
+from utils.http import HttpFetcher
+from utils.dedupe import Deduper
+from utils.profiles import load_profiles
+from utils.sessions import get_session_pool
+from utils.notify import get_notifier
 
 # Load environment variables
 load_dotenv()
@@ -20,30 +25,24 @@ EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 RECIPIENT_EMAIL = os.getenv("RECIPIENT_EMAIL")
 
-# Set up Chrome WebDriver
-chrome_options = Options()
-chrome_options.add_argument("--headless")  # Run in background
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
+def login_to_linkedin(driver):
+    waits.open_page(driver, "https://www.linkedin.com/login")
 
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-
-def login_to_linkedin():
-    driver.get("https://www.linkedin.com/login")
-    time.sleep(2)
-
-    username_input = driver.find_element(By.ID, "username")
+    username_input = waits.wait_present(driver, (By.ID, "username"))
     password_input = driver.find_element(By.ID, "password")
     username_input.send_keys(LINKEDIN_USERNAME)
     password_input.send_keys(LINKEDIN_PASSWORD)
     password_input.send_keys(Keys.RETURN)
-    time.sleep(3)
+    try:
+        waits.wait_url_leaves(driver, "/login")
+    except TimeoutException:
+        print("Still on the login page after submitting credentials")
 
-def search_jobs(query="Software Engineer", location="Remote"):
-    driver.get("https://www.linkedin.com/jobs")
-    time.sleep(3)
+# fetch_html=False leaves the results in the browser for extract_cards_in_browser
+def search_jobs(driver, query="Software Engineer", location="Remote", fetch_html=True):
+    waits.open_page(driver, "https://www.linkedin.com/jobs")
 
-    search_keyword = driver.find_element(By.CSS_SELECTOR, "input[aria-label='Search jobs']")
+    search_keyword = waits.wait_present(driver, (By.CSS_SELECTOR, "input[aria-label='Search jobs']"))
     search_location = driver.find_element(By.CSS_SELECTOR, "input[aria-label='Search location']")
 
     search_keyword.clear()
@@ -52,43 +51,80 @@ def search_jobs(query="Software Engineer", location="Remote"):
     search_location.send_keys(location)
     search_location.send_keys(Keys.RETURN)
 
-    time.sleep(5)
-    return driver.page_source
+    try:
+        waits.wait_present(driver, (By.CSS_SELECTOR, "li.jobs-search-results__list-item"))
+    except TimeoutException:
+        print("No job results appeared before the wait timed out")
+    if not fetch_html:
+        return None
+    html = driver.page_source
+    save_page(html, "linkedin")
+    return html
 
-def parse_jobs(page_html):
-    soup = BeautifulSoup(page_html, "html.parser")
-    job_elements = soup.find_all("li", class_="jobs-search-results__list-item")
+CARD_FIELDS = {"title": ("span.screen-reader-text", None), "href": ("a[href]", "href")}
 
+def job_links(cards):
     jobs = []
-    for job in job_elements:
-        title_elem = job.find("span", class_="screen-reader-text")
-        link_elem = job.find("a", href=True)
-        if title_elem and link_elem:
-            jobs.append((title_elem.get_text(strip=True), f"https://www.linkedin.com{link_elem['href']}"))
+    for card in cards:
+        if card["title"] and card["href"]:
+            jobs.append(Job(card["title"], f"https://www.linkedin.com{card['href']}", "LinkedIn"))
 
     return jobs
 
+def parse_jobs(page_html):
+    return job_links(extract_cards(page_html, CARD_FIELDS))
+
 def email_results(jobs):
     if not jobs:
         return
 
-    body = "\n\n".join([f"{title}\n{link}" for title, link in jobs])
-    msg = MIMEText(body)
-    msg["Subject"] = "Weekly Job Listings"
-    msg["From"] = EMAIL_ADDRESS
-    msg["To"] = RECIPIENT_EMAIL
-
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.send_message(msg)
+    body = "\n\n".join([f"{job.title}\n{job.url}" for job in jobs])
+    # Sent from a background thread; exit waits at most NOTIFY_EXIT_WAIT seconds for it
+    get_notifier(EMAIL_ADDRESS, EMAIL_PASSWORD).email(RECIPIENT_EMAIL, "Weekly Job Listings", body)
+
+# Search in a logged-in browser; used when plain HTTP discovery is off or refused
+def browser_jobs(query="Software Engineer", location="Remote"):
+    # Reuses the saved LinkedIn session and only logs in again when it has expired
+    sessions = get_session_pool("linkedin", login_to_linkedin, headless=True, fast=True)
+    driver = sessions.acquire()
+    try:
+        in_browser = EXTRACT_MODE == "browser"
+        with metrics.span("search", "linkedin.com"):
+            html = search_jobs(driver, query, location, fetch_html=not in_browser)
+        with metrics.span("parse", "linkedin.com"):
+            if in_browser:
+                return job_links(extract_cards_in_browser(driver, CARD_FIELDS))
+            return parse_jobs(html)
+    finally:
+        print(waits.stats.summary())
+        sessions.release(driver)
+
+def find_jobs(query, location, fetcher):
+    # Listing pages are read over HTTP first; Chrome only starts if LinkedIn turns that away
+    jobs = None
+    if DISCOVERY_MODE == "http":
+        jobs = fetch_linkedin_listings(query, location, fetcher=fetcher)
+    if jobs is None:
+        jobs = browser_jobs(query, location)
+    return jobs
 
+# Every search in profiles.json that includes LinkedIn runs in this one process over one HTTP
+# session and at most one logged-in browser; a listing found by several searches is emailed once
 def main():
-    login_to_linkedin()
-    html = search_jobs()
-    jobs = parse_jobs(html)
+    jobs = []
+    profiles = [profile for profile in load_profiles() if profile.uses("LinkedIn")]
+    if not profiles:
+        print("No profiles search LinkedIn.")
+        return
+    with HttpFetcher.for_session("linkedin") as fetcher:
+        for profile in profiles:
+            jobs.extend(find_jobs(profile.query, profile.location, fetcher))
+        print(fetcher.summary())
+    jobs, _ = Deduper().dedupe(jobs)
+    get_store().upsert_many(jobs)
     email_results(jobs)
+    print(metrics.summary())
     print(f"✔ Found and emailed {len(jobs)} jobs.")
-    driver.quit()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
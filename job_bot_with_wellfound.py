@@ -1,40 +1,45 @@
 # ... (Previous imports and code unchanged until parse_wellfound_jobs)
+from utils import waits
+from utils.storage import get_store
+from utils.results import get_results_sink
+from utils.dedupe import dedupe_against_store
+from utils.sessions import get_session_pool
+from utils.notify import get_notifier
+from utils.scheduler import run_scheduler
+from scrapers import search_sources
+from utils.cover_letters import get_letter_cache, letter_key
+from utils.filters import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, get_filter, keywords_from_env
 
-def apply_to_job(job_link, cover_letter):
+def apply_to_job(driver, job_link, cover_letter):
     logger.info(f"Attempting to apply to job: {job_link}")
     try:
-        driver.get(job_link)
-        WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button.jobs-apply-button")))
-        apply_button = driver.find_element(By.CSS_SELECTOR, "button.jobs-apply-button")
-        apply_button.click()
+        waits.open_page(driver, job_link)
+        waits.click(driver, (By.CSS_SELECTOR, "button.jobs-apply-button"))
         # Assume simple form with cover letter field
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "textarea")))
-        cover_letter_field = driver.find_element(By.CSS_SELECTOR, "textarea")
+        cover_letter_field = waits.wait_present(driver, (By.CSS_SELECTOR, "textarea"))
         cover_letter_field.send_keys(cover_letter)
-        submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-        submit_button.click()
+        waits.click(driver, (By.CSS_SELECTOR, "button[type='submit']"))
         logger.info(f"Applied to job: {job_link}")
         return True
     except (TimeoutException, NoSuchElementException, WebDriverException) as e:
         logger.warning(f"Failed to apply to job {job_link}: {str(e)}")
         return False
 
+SEARCH_QUERY = os.getenv("JOB_SEARCH_QUERY", "Software Engineer")
+SEARCH_LOCATION = os.getenv("JOB_SEARCH_LOCATION", "Remote")
+
+INCLUDE_KEYWORDS = keywords_from_env("JOB_INCLUDE_KEYWORDS", DEFAULT_INCLUDE)
+EXCLUDE_KEYWORDS = keywords_from_env("JOB_EXCLUDE_KEYWORDS", DEFAULT_EXCLUDE)
+
+# Keywords use the utils.filters rule syntax (whole words; "-" negates, "field:" and "^weight" are optional)
 def filter_jobs(jobs, include_keywords=None, exclude_keywords=None):
     logger.info("Filtering jobs")
-    include_keywords = include_keywords or ["Python", "Junior", "Entry Level"]
-    exclude_keywords = exclude_keywords or ["Senior", "Lead", "Principal"]
-    filtered_jobs = []
-    for job in jobs:
-        title = job[0].lower()
-        if (any(kw.lower() in title for kw in include_keywords) and
-            not any(kw.lower() in title for kw in exclude_keywords)):
-            filtered_jobs.append(job)
-        else:
-            logger.info(f"Filtered out job: {job[0]}")
-    logger.info(f"Filtered to {len(filtered_jobs)} jobs")
+    job_filter = get_filter(include_keywords or INCLUDE_KEYWORDS, exclude_keywords or EXCLUDE_KEYWORDS)
+    filtered_jobs = job_filter.filter(jobs)
+    logger.info(f"Filtered to {len(filtered_jobs)} jobs ({len(jobs) - len(filtered_jobs)} filtered out)")
     return filtered_jobs
 
-def generate_cover_letter(job_title):
+def render_cover_letter(job_title):
     logger.info(f"Generating cover letter for {job_title}")
     try:
         sanitized_title = re.sub(r'[^\x00-\x7F]+', '', job_title)
@@ -55,22 +60,37 @@ Sincerely,
         logger.error(f"Error generating cover letter: {str(e)}")
         return ""
 
+# Letters are cached by their inputs, so the apply step and the CSV log share one rendering per job
+def generate_cover_letter(job_title):
+    key = letter_key("template", job_title, USER_SKILLS, USER_NAME)
+    return get_letter_cache().get_or_create(key, lambda: render_cover_letter(job_title))
+
+SUBMITTED_CSV = "submitted_jobs.csv"
+SUBMITTED_HEADER = ["Timestamp", "Job Title", "Link", "Source", "Cover Letter", "Applied"]
+
+# Rows are appended through one shared writer as each job is processed; the Cover Letter column
+# holds the path of the letter file (stored once per distinct letter) rather than its text
+def log_job_to_csv(job, applied=False):
+    try:
+        sink = get_results_sink(SUBMITTED_CSV, SUBMITTED_HEADER)
+        timestamp = datetime.datetime.now().isoformat()
+        sanitized_title = re.sub(r'[^\x00-\x7F]+', '', job.title)
+        cover_letter = generate_cover_letter(job.title)
+        sink.write([timestamp, sanitized_title, job.url, job.source, sink.attach(cover_letter), "Yes" if applied else "No"])
+    except Exception as e:
+        logger.error(f"Error logging job to CSV: {str(e)}")
+
 def log_jobs_to_csv(jobs, applied_jobs=None):
     logger.info("Logging jobs to CSV")
-    applied_jobs = applied_jobs or []
+    applied_jobs = set(applied_jobs or ())
+    for job in jobs:
+        log_job_to_csv(job, job.url in applied_jobs)
+    checkpoint_csv()
+
+def checkpoint_csv():
     try:
-        file_exists = os.path.isfile("submitted_jobs.csv")
-        with open("submitted_jobs.csv", "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(["Timestamp", "Job Title", "Link", "Source", "Cover Letter", "Applied"])
-            for job in jobs:
-                timestamp = datetime.datetime.now().isoformat()
-                sanitized_title = re.sub(r'[^\x00-\x7F]+', '', job[0])
-                cover_letter = generate_cover_letter(job[0])
-                applied = "Yes" if job[1] in applied_jobs else "No"
-                writer.writerow([timestamp, sanitized_title, job[1], job[2], cover_letter, applied])
-        logger.info("Jobs logged to submitted_jobs.csv")
+        get_results_sink(SUBMITTED_CSV, SUBMITTED_HEADER).checkpoint()
+        logger.info(f"Jobs logged to {SUBMITTED_CSV}")
     except Exception as e:
         logger.error(f"Error logging jobs to CSV: {str(e)}")
 
@@ -78,77 +98,69 @@ def email_results(jobs):
     if not jobs:
         logger.info("No jobs to email")
         return
-    try:
-        body = "\n\n".join([f"{title}\n{link} ({source})" for title, link, source in jobs])
-        msg = MIMEText(body)
-        msg["Subject"] = "Weekly Job Listings from Job Bot"
-        msg["From"] = EMAIL_ADDRESS
-        msg["To"] = RECIPIENT_EMAIL
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            server.send_message(msg)
-        logger.info("Email sent successfully")
-    except Exception as e:
-        logger.error(f"Error sending email: {str(e)}")
+    body = "\n\n".join([f"{job.title}\n{job.url} ({job.source})" for job in jobs])
+    # Sent from the notifier's background thread over its shared SMTP connection
+    get_notifier(EMAIL_ADDRESS, EMAIL_PASSWORD).email(RECIPIENT_EMAIL, "Weekly Job Listings from Job Bot", body)
+    logger.info("Email queued")
 
 def send_slack_notification(jobs, applied_jobs=None):
-    applied_jobs = applied_jobs or []
+    applied_jobs = set(applied_jobs or ())
     if not jobs or not SLACK_WEBHOOK_URL:
         logger.info("No jobs or Slack webhook URL, skipping notification")
         return
-    for attempt in range(3):
-        try:
-            message = f"Found {len(jobs)} jobs (applied to {len(applied_jobs)}):\n" + \
-                      "\n".join([f"- {title} ({source}): {link} {'[Applied]' if link in applied_jobs else ''}" for title, link, source in jobs])
-            payload = {"text": message}
-            response = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=10)
-            if response.status_code == 200:
-                logger.info("Slack notification sent successfully")
-                return
-            else:
-                logger.warning(f"Slack notification attempt {attempt + 1} failed: {response.text}")
-        except Exception as e:
-            logger.warning(f"Slack notification attempt {attempt + 1} failed: {str(e)}")
-        time.sleep(5)
-    logger.error("Failed to send Slack notification after 3 attempts")
-
-def main():
+    message = f"Found {len(jobs)} jobs (applied to {len(applied_jobs)}):\n" + \
+              "\n".join([f"- {job.title} ({job.source}): {job.url} {'[Applied]' if job.url in applied_jobs else ''}" for job in jobs])
+    # Failed posts are retried with backoff on the notifier's thread, not here
+    get_notifier().slack(message)
+
+def main(query=SEARCH_QUERY, location=SEARCH_LOCATION, sources=None):
     logger.info("Starting job bot")
     jobs = []
-    applied_jobs = []
+    applied_jobs = set()
+    store = get_store()
+    sessions = linkedin_sessions()
+    driver = None
     try:
-        login_to_linkedin()
-        linkedin_html = search_jobs()
-        jobs.extend(parse_linkedin_jobs(linkedin_html))
-        indeed_html = search_indeed_jobs()
-        jobs.extend(parse_indeed_jobs(indeed_html))
-        wellfound_html = search_wellfound_jobs()
-        jobs.extend(parse_wellfound_jobs(wellfound_html))
+        # Every registered source is searched at once; a slow or broken site is logged and left out
+        found = dedupe_against_store(search_sources(query, location, sources=sources), store)
+        store.upsert_many(found)
+        jobs.extend(found)
         # Filter jobs
         filtered_jobs = filter_jobs(jobs)
         # Apply to LinkedIn jobs with Easy Apply
         for job in filtered_jobs:
-            if job[2] == "LinkedIn":  # Only apply to LinkedIn jobs
-                cover_letter = generate_cover_letter(job[0])
-                if apply_to_job(job[1], cover_letter):
-                    applied_jobs.append(job[1])
-        log_jobs_to_csv(filtered_jobs, applied_jobs)
+            if job.source == "LinkedIn" and store.has_applied(job):
+                logger.info(f"Already applied to {job.url}, skipping")
+            elif job.source == "LinkedIn":  # Only apply to LinkedIn jobs
+                # The browser is only started once there is something to apply to
+                if driver is None:
+                    driver = sessions.acquire()
+                cover_letter = generate_cover_letter(job.title)
+                if apply_to_job(driver, job.url, cover_letter):
+                    applied_jobs.add(job.url)
+                    store.set_status(job, "applied")
+                else:
+                    store.set_status(job, "failed")
+            log_job_to_csv(job, job.url in applied_jobs)
+        checkpoint_csv()
         email_results(filtered_jobs)
         send_slack_notification(filtered_jobs, applied_jobs)
         logger.info(f"✔ Found {len(jobs)} jobs, filtered to {len(filtered_jobs)}, applied to {len(applied_jobs)}")
+        logger.info(get_letter_cache().summary())
     except Exception as e:
         logger.error(f"Main process failed: {str(e)}")
     finally:
-        driver.quit()
-        logger.info("WebDriver closed")
+        if driver is not None:
+            sessions.release(driver)
+            logger.info("WebDriver returned to session pool")
+
+def linkedin_sessions():
+    return get_session_pool("linkedin", login_to_linkedin, headless=True, fast=True)
 
-def run_job_bot():
-    main()
+def run_job_bot(profile):
+    main(profile.query, profile.location, profile.sources)
 
 if __name__ == "__main__":
     logger.info("Starting bot with scheduler")
-    tz = pytz.timezone("America/Los_Angeles")
-    schedule.every().monday.at("09:00", tz).do(run_job_bot)
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
\ No newline at end of file
+    # Profiles and their cron schedules come from profiles.json (see utils/profiles.py)
+    run_scheduler(run_job_bot)
\ No newline at end of file
@@ -0,0 +1,99 @@
+# scrapers/__init__.py
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from utils.http import HttpFetcher
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds a source may take before the fan-out stops waiting for it
+SOURCE_TIMEOUT = float(os.getenv("SOURCE_TIMEOUT", "60"))
+
+SOURCES = {}
+
+
+# The site answered, but not with listings (login wall, challenge, changed layout)
+class SourceError(Exception):
+    pass
+
+
+# A job board adapter. Subclasses set `name`, optionally `timeout` and `session` (the browser
+# session pool whose saved cookies the HTTP client should send), and implement
+# search(query, location, limit) returning a list of utils.models.Job.
+class JobSource:
+    name = None
+    timeout = SOURCE_TIMEOUT
+    session = None
+
+    def __init__(self):
+        self._fetcher = None
+        self._lock = threading.Lock()
+
+    # One pooled HTTP client per source, kept for the life of the process
+    @property
+    def fetcher(self):
+        with self._lock:
+            if self._fetcher is None:
+                self._fetcher = HttpFetcher.for_session(self.session) if self.session else HttpFetcher()
+            return self._fetcher
+
+    def search(self, query, location="", limit=None):
+        raise NotImplementedError
+
+
+def register(cls):
+    SOURCES[cls.name] = cls()
+    return cls
+
+
+# Registered name for a source, matched case-insensitively ("linkedin" -> "LinkedIn")
+def source_name(name):
+    for registered in SOURCES:
+        if registered.lower() == str(name).strip().lower():
+            return registered
+    raise ValueError(f"Unknown job source: {name} (known: {', '.join(SOURCES)})")
+
+
+def get_source(name):
+    return SOURCES[source_name(name)]
+
+
+# Query every source (or the named ones) at once and return all their jobs. Each source gets
+# its own deadline; one that fails or runs over is logged and left out instead of stalling or
+# failing the run. A source that runs over keeps its thread until its HTTP timeout ends it.
+def search_sources(query, location="", sources=None, limit=None, timeout=None):
+    selected = [get_source(name) for name in (sources or list(SOURCES))]
+    if not selected:
+        return []
+    executor = ThreadPoolExecutor(max_workers=len(selected), thread_name_prefix="job-source")
+    started = time.monotonic()
+    futures = [(source, executor.submit(source.search, query, location, limit)) for source in selected]
+    jobs = []
+    try:
+        for source, future in futures:
+            deadline = started + (timeout or source.timeout)
+            try:
+                found = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                metrics.record("source", time.monotonic() - started, source.name, ok=False)
+                logger.warning(f"{source.name} did not answer within {timeout or source.timeout:.0f}s, skipping it")
+                continue
+            except Exception as e:
+                metrics.record("source", time.monotonic() - started, source.name, ok=False)
+                logger.warning(f"{source.name} search failed: {e}")
+                continue
+            metrics.record("source", time.monotonic() - started, source.name)
+            logger.info(f"{source.name}: {len(found)} job(s) in {time.monotonic() - started:.1f}s")
+            jobs.extend(found)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return jobs
+
+
+# Importing the adapters registers them
+from scrapers import indeed, linkedin, wellfound  # noqa: E402,F401
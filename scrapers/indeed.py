@@ -0,0 +1,51 @@
+# scrapers/indeed.py
+import os
+
+from scrapers import JobSource, SourceError, get_source, register
+from utils.models import Job
+from utils.parsing import extract_cards, save_page
+
+INDEED_URL = os.getenv("INDEED_URL", "https://www.indeed.com")
+INDEED_PAGES = int(os.getenv("INDEED_PAGES", "2"))
+PAGE_SIZE = 10
+
+CARD_SELECTOR = "div.job_seen_beacon"
+CARD_FIELDS = {
+    "title": ("h2.jobTitle span[title]", "title"),
+    "jk": ("a.jcs-JobTitle", "data-jk"),
+    "company": ("span[data-testid='company-name']", None),
+    "location": ("div[data-testid='text-location']", None),
+}
+
+
+@register
+class IndeedSource(JobSource):
+    name = "Indeed"
+
+    def search(self, query, location="", limit=None):
+        jobs = []
+        pages = -(-limit // PAGE_SIZE) if limit else INDEED_PAGES
+        for page in range(pages):
+            html = self.fetcher.get(f"{INDEED_URL}/jobs", params={"q": query, "l": location, "start": page * PAGE_SIZE})
+            if html is None:
+                if jobs:
+                    break
+                raise SourceError("Indeed refused the search request")
+            save_page(html, "indeed")
+            cards = extract_cards(html, CARD_FIELDS, card_selector=CARD_SELECTOR)
+            if not cards:
+                break
+            for card in cards:
+                if card["title"] and card["jk"]:
+                    jobs.append(Job(
+                        title=card["title"],
+                        url=f"{INDEED_URL}/viewjob?jk={card['jk']}",
+                        source=self.name,
+                        company=card["company"],
+                        location=card["location"],
+                    ))
+        return jobs[:limit] if limit else jobs
+
+
+def get_indeed_jobs(query, location="", limit=None):
+    return get_source(IndeedSource.name).search(query, location, limit)
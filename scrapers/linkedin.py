@@ -0,0 +1,23 @@
+# scrapers/linkedin.py
+from scrapers import JobSource, SourceError, get_source, register
+from utils.listings import HTTP_SEARCH_PAGES, fetch_linkedin_listings
+
+# The public search fragment returns about this many cards per request
+PAGE_SIZE = 10
+
+
+@register
+class LinkedInSource(JobSource):
+    name = "LinkedIn"
+    session = "linkedin"
+
+    def search(self, query, location="", limit=None):
+        pages = -(-limit // PAGE_SIZE) if limit else HTTP_SEARCH_PAGES
+        jobs = fetch_linkedin_listings(query, location, pages=pages, fetcher=self.fetcher)
+        if jobs is None:
+            raise SourceError("LinkedIn refused the search request")
+        return jobs[:limit] if limit else jobs
+
+
+def get_linkedin_jobs(query, location="", limit=None):
+    return get_source(LinkedInSource.name).search(query, location, limit)
@@ -0,0 +1,50 @@
+# scrapers/wellfound.py
+import re
+
+from scrapers import JobSource, SourceError, get_source, register
+from utils.extract import absolute_url
+from utils.models import Job
+from utils.parsing import save_page
+
+WELLFOUND_URL = "https://wellfound.com"
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+# Role pages list startups, each with its open jobs linked as /jobs/<id>-<slug>
+def parse_wellfound_jobs(html, source="Wellfound"):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    jobs = []
+    seen = set()
+    for link in soup.select("a[href*='/jobs/']"):
+        url = absolute_url(link.get("href"), WELLFOUND_URL)
+        title = link.get_text(" ", strip=True)
+        if not url or not title or url in seen or not re.search(r"/jobs/\d+", url):
+            continue
+        seen.add(url)
+        startup = link.find_parent(attrs={"data-test": "StartupResult"})
+        heading = startup.find("h2") if startup else None
+        jobs.append(Job(title=title, url=url, source=source, company=heading.get_text(strip=True) if heading else None))
+    return jobs
+
+
+@register
+class WellfoundSource(JobSource):
+    name = "Wellfound"
+
+    def search(self, query, location="", limit=None):
+        path = f"/role/l/{_slug(query)}/{_slug(location)}" if location and location.lower() != "remote" else f"/role/r/{_slug(query)}"
+        html = self.fetcher.get(WELLFOUND_URL + path)
+        if html is None:
+            raise SourceError("Wellfound refused the search request")
+        save_page(html, "wellfound")
+        jobs = parse_wellfound_jobs(html, self.name)
+        return jobs[:limit] if limit else jobs
+
+
+def get_wellfound_jobs(query, location="", limit=None):
+    return get_source(WellfoundSource.name).search(query, location, limit)
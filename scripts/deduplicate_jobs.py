@@ -0,0 +1,47 @@
+# scripts/deduplicate_jobs.py
+
+import argparse
+
+from utils.storage import APPLIED_STATUSES, get_store
+from utils.dedupe import Deduper, stored_dedupe_keys
+
+DUPLICATE_STATUS = "duplicate"
+
+# Walk the stored history, applied jobs first and then oldest first, and mark reposts of an
+# earlier job as duplicates. Jobs we already applied to keep their status and are only reported.
+def run(dry_run=False):
+    store = get_store()
+    keys = stored_dedupe_keys(store)
+    deduper = Deduper()
+    duplicates = []
+
+    print(f"🧹 [Deduplicate Jobs] Checking {len(keys)} stored job(s)...")
+    history = sorted(store.iter_jobs(), key=lambda job: (job["status"] or "").lower() not in APPLIED_STATUSES)
+    for job in history:
+        if (job["status"] or "").lower() == DUPLICATE_STATUS or job["id"] not in keys:
+            continue
+        original = deduper.check_keys(job["id"], *keys[job["id"]])
+        if original is None:
+            deduper.add_keys(job["id"], *keys[job["id"]])
+        else:
+            duplicates.append((job, original))
+
+    marked = 0
+    for job, original in duplicates:
+        kept = store.get(original) or {}
+        print(f"  {job['title']} at {job['company']} ({job['source']}) duplicates {kept.get('title')} at {kept.get('company')} ({kept.get('source')})")
+        if dry_run or (job["status"] or "").lower() in APPLIED_STATUSES:
+            continue
+        store.set_status({"id": job["id"]}, DUPLICATE_STATUS)
+        marked += 1
+
+    if dry_run:
+        print(f"✅ Found {len(duplicates)} duplicate(s); nothing changed (dry run).")
+    else:
+        print(f"✅ Found {len(duplicates)} duplicate(s), marked {marked} as '{DUPLICATE_STATUS}'.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mark reposted jobs in the job store as duplicates")
+    parser.add_argument("--dry-run", action="store_true", help="Only report duplicates")
+    args = parser.parse_args()
+    run(dry_run=args.dry_run)
@@ -1,27 +1,31 @@
-# scripts/search_jobs.py
-
-from utils.storage import load_json, save_json
-from scrapers.wellfound import get_wellfound_jobs
-from scrapers.linkedin import get_linkedin_jobs
-
-def run():
-    print("🔍 [Search Jobs] Searching Wellfound...")
-    existing = load_json("data/job_listings.json")
-    existing_ids = {job["id"] for job in existing}
-
-    new_jobs = get_wellfound_jobs("python")
-    added = 0
-    for job in new_jobs:
-        if job["id"] not in existing_ids:
-            existing.append(job)
-            added += 1
-
-    print("🔍 [Search Jobs] Searching LinkedIn...")
-    linkedin_jobs = get_linkedin_jobs("python developer", limit=10)
-    for job in linkedin_jobs:
-        if job["id"] not in existing_ids:
-            existing.append(job)
-            added += 1
-
-    save_json("data/job_listings.json", existing)
-    print(f"✅ Added {added} new job(s) from Wellfound and LinkedIn.")
+# scripts/search_jobs.py
+
+from utils.storage import get_store
+from utils.dedupe import Deduper
+from scrapers.wellfound import get_wellfound_jobs
+from scrapers.linkedin import get_linkedin_jobs
+
+# A site that is down or blocking us is reported and skipped, not fatal to the command
+def search(label, fetch):
+    try:
+        return fetch()
+    except Exception as e:
+        print(f"⚠️ [Search Jobs] {label} search failed: {e}")
+        return []
+
+def run():
+    store = get_store()
+    # Reposts of a stored job (or of one found earlier in this run) are dropped before they're stored
+    deduper = Deduper.from_store(store)
+
+    print("🔍 [Search Jobs] Searching Wellfound...")
+    new_jobs, duplicates = deduper.dedupe(search("Wellfound", lambda: get_wellfound_jobs("python")))
+    added = len(store.upsert_many(new_jobs))
+    skipped = len(duplicates)
+
+    print("🔍 [Search Jobs] Searching LinkedIn...")
+    linkedin_jobs, duplicates = deduper.dedupe(search("LinkedIn", lambda: get_linkedin_jobs("python developer", limit=10)))
+    added += len(store.upsert_many(linkedin_jobs))
+    skipped += len(duplicates)
+
+    print(f"✅ Added {added} new job(s) from Wellfound and LinkedIn, skipped {skipped} duplicate(s).")
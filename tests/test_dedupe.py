@@ -0,0 +1,52 @@
+from utils.dedupe import Deduper, fingerprint, normalize_company, stored_dedupe_keys
+from utils.models import Job
+from utils.storage import JobStore
+
+
+def test_placeholder_company_is_missing():
+    assert normalize_company("N/A") == ""
+    assert normalize_company(None) == ""
+    assert fingerprint({"title": "Software Engineer", "company": "N/A", "location": "N/A"}) is None
+
+
+def test_jobs_without_company_are_kept_apart():
+    jobs = [
+        Job("Software Engineer", f"https://www.linkedin.com/jobs/view/{id_}", "LinkedIn", company="N/A", location="N/A")
+        for id_ in range(100, 105)
+    ]
+    unique, duplicates = Deduper().dedupe(jobs)
+    assert len(unique) == 5
+    assert not duplicates
+
+
+def test_same_job_from_two_boards_is_a_duplicate():
+    jobs = [
+        Job("Sr. Software Engineer", "https://www.linkedin.com/jobs/view/100", "LinkedIn", company="Acme, Inc.", location="Remote"),
+        Job("Senior Software Engineer", "https://www.indeed.com/viewjob?jk=abc", "Indeed", company="Acme", location="Remote"),
+    ]
+    unique, duplicates = Deduper().dedupe(jobs)
+    assert len(unique) == 1
+    assert len(duplicates) == 1
+
+
+def test_status_updates_keep_dedupe_keys(tmp_path):
+    job = {"url": "https://www.indeed.com/viewjob?jk=1", "title": "Engineer", "company": "Acme"}
+    with JobStore(str(tmp_path / "jobs.db"), migrate=False) as store:
+        store.upsert(job)
+        stored_dedupe_keys(store)
+        store.set_status(job, "applied")
+        store.upsert(dict(job, notes="phone screen"))
+        assert not store.jobs_without_dedupe_keys()
+        store.upsert(dict(job, title="Senior Engineer"))
+        assert len(store.jobs_without_dedupe_keys()) == 1
+
+
+def test_only_applied_jobs_block_when_asked(tmp_path):
+    original = {"url": "https://www.indeed.com/viewjob?jk=1", "title": "Engineer", "company": "Acme", "location": "Remote"}
+    repost = dict(original, url="https://www.linkedin.com/jobs/view/100")
+    with JobStore(str(tmp_path / "jobs.db"), migrate=False) as store:
+        store.upsert(original, status="failed")
+        assert Deduper.from_store(store).check(repost)
+        assert Deduper.from_store(store, statuses={"applied"}).check(repost) is None
+        store.set_status(original, "applied")
+        assert Deduper.from_store(store, statuses={"applied"}).check(repost)
@@ -0,0 +1,35 @@
+import pytest
+
+from utils.filters import JobFilter, Rule, keywords_from_env
+
+
+@pytest.mark.parametrize("spec", ["-", "*", "!", "company:", "^2", "title:*"])
+def test_empty_keyword_is_rejected(spec):
+    with pytest.raises(ValueError):
+        Rule.parse(spec)
+
+
+def test_empty_keyword_in_env_is_rejected(monkeypatch):
+    monkeypatch.setenv("JOB_INCLUDE_KEYWORDS", "python,-")
+    with pytest.raises(ValueError):
+        keywords_from_env("JOB_INCLUDE_KEYWORDS", [])
+
+
+def test_filter_ends_on_non_matching_text():
+    job_filter = JobFilter(["python"], ["senior"])
+    assert not job_filter.matches({"title": "java"})
+    assert job_filter.matches({"title": "python developer"})
+    assert not job_filter.matches({"title": "senior python developer"})
+
+
+def test_overlapping_keywords_all_count():
+    job_filter = JobFilter(["python^1", "python developer^5"])
+    assert job_filter.score({"title": "python developer"}) == 6.0
+    assert job_filter.score({"title": "python engineer"}) == 1.0
+
+
+def test_prefix_and_whole_word_keywords_score_separately():
+    job_filter = JobFilter(["engineer*^2", "engineering^1"], min_score=3)
+    assert job_filter.score({"title": "software engineering"}) == 3.0
+    assert job_filter.matches({"title": "software engineering"})
+    assert not job_filter.matches({"title": "software engineer"})
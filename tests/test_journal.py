@@ -0,0 +1,24 @@
+from utils.journal import Journal
+
+
+def test_resume_retries_started_jobs(tmp_path):
+    journal = Journal("run", directory=str(tmp_path))
+    journal.set_cursor(url="search", page=3)
+    journal.transition("a", "applied")
+    journal.transition("b", "started")
+    journal.close()
+
+    resumed = Journal("run", directory=str(tmp_path))
+    assert resumed.cursor == {"url": "search", "page": 3}
+    assert resumed.done("a")
+    assert not resumed.done("b")
+    resumed.close()
+
+
+def test_finish_rotates_and_releases_the_file(tmp_path):
+    journal = Journal("run", directory=str(tmp_path))
+    journal.transition("a", "applied")
+    journal.finish()
+    assert journal._file is None
+    assert [path.name for path in tmp_path.iterdir()][0].endswith(".done.jsonl")
+    assert not Journal("run", directory=str(tmp_path)).resuming
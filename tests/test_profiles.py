@@ -0,0 +1,8 @@
+from utils.profiles import Profile
+
+
+def test_profile_sources_match_in_any_case():
+    assert Profile("backend", "python", sources=("LinkedIn",)).uses("linkedin")
+    assert Profile("backend", "python", sources=("linkedin",)).uses("LinkedIn")
+    assert not Profile("backend", "python", sources=("Indeed",)).uses("LinkedIn")
+    assert Profile("backend", "python").uses("LinkedIn")
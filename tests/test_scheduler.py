@@ -0,0 +1,30 @@
+import datetime
+
+import pytest
+
+from utils.profiles import Profile
+from utils.scheduler import CronSchedule, Scheduler
+
+
+def test_names_match_numbers():
+    assert CronSchedule("30 8 * * MON-FRI").weekdays == CronSchedule("30 8 * * 1-5").weekdays
+    assert CronSchedule("0 9 1 jan,Jul *").months == {1, 7}
+
+
+@pytest.mark.parametrize("expression", ["0 9 * * MONDAY", "0 9 * FOO *", "x 9 * * *", "0 9 * * 1/y"])
+def test_bad_values_name_the_field(expression):
+    with pytest.raises(ValueError, match="Cron field"):
+        CronSchedule(expression)
+
+
+def test_next_after_on_a_weekday():
+    after = datetime.datetime(2026, 10, 16, 10, 0)  # a Friday
+    assert CronSchedule("0 9 * * MON").next_after(after) == datetime.datetime(2026, 10, 19, 9, 0)
+
+
+def test_profiles_default_to_local_time():
+    profile = Profile("default", "python")
+    assert profile.timezone is None
+    scheduler = Scheduler([profile], run=lambda profile: None)
+    due = datetime.datetime.fromtimestamp(scheduler.next_due(profile, 0))
+    assert (due.weekday(), due.hour, due.minute) == (0, 9, 0)
@@ -0,0 +1,89 @@
+import csv
+
+from utils.storage import LEGACY_SUBMITTED_CSV, JobStore, job_id
+
+URL = "https://www.linkedin.com/jobs/view/123"
+
+
+def _append_submitted(path, applied):
+    new = not path.exists()
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new:
+            writer.writerow(["Job Title", "Link", "Source", "Applied"])
+        writer.writerow(["Engineer", URL, "LinkedIn", applied])
+
+
+def test_legacy_reimport_keeps_applied_status(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = tmp_path / "jobs.db"
+    with JobStore(str(db)) as store:
+        store.set_status({"url": URL, "title": "Engineer", "source": "LinkedIn"}, "applied")
+
+    # The old bots keep appending to their CSV, so it changes and is read again
+    _append_submitted(tmp_path / LEGACY_SUBMITTED_CSV, "No")
+    with JobStore(str(db)) as store:
+        assert store.get(job_id({"url": URL}))["status"] == "applied"
+        assert store.has_applied({"url": URL})
+
+
+def test_legacy_import_fills_new_jobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = tmp_path / "jobs.db"
+    with JobStore(str(db)) as store:
+        store.upsert({"url": URL, "title": "Engineer"})
+
+    _append_submitted(tmp_path / LEGACY_SUBMITTED_CSV, "No")
+    with JobStore(str(db)) as store:
+        assert store.get(job_id({"url": URL}))["status"] == "seen"
+
+    _append_submitted(tmp_path / LEGACY_SUBMITTED_CSV, "Yes")
+    with JobStore(str(db)) as store:
+        assert store.has_applied({"url": URL})
+
+
+def test_tracking_parameters_do_not_change_the_id(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with JobStore(str(tmp_path / "jobs.db")) as store:
+        store.set_status({"url": URL + "/?refId=abc&trackingId=xyz"}, "applied")
+        assert store.has_applied({"url": URL})
+        assert store.has_applied({"url": "https://linkedin.com/jobs/view/engineer-at-acme-123?trk=public"})
+        assert store.find_by_url(URL + "?utm_source=feed")["status"] == "applied"
+        assert store.count() == 1
+
+
+def test_raw_url_ids_are_rekeyed_and_merged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = str(tmp_path / "jobs.db")
+    with JobStore(db) as store:
+        # Rows as a store that hashed the raw URL would have written them
+        store.upsert({"id": "old-applied", "url": URL + "?refId=1"}, status="applied")
+        store.upsert({"id": "old-seen", "url": URL + "?refId=2"}, status="seen")
+        store.set_meta("id_scheme", "raw-url")
+    with JobStore(db) as store:
+        assert store.count() == 1
+        assert store.get(job_id({"url": URL}))["status"] == "applied"
+
+
+def test_legacy_csv_is_read_from_where_it_stopped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = str(tmp_path / "jobs.db")
+    csv_path = tmp_path / LEGACY_SUBMITTED_CSV
+    _append_submitted(csv_path, "No")
+    with JobStore(db) as store:
+        assert store.count() == 1
+        # Gone from the store; a full re-read would bring it back
+        with store._conn:
+            store._conn.execute("DELETE FROM jobs")
+
+    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+        f.write("Engineer,https://www.indeed.com/viewjob?jk=1,Indeed,No\n")
+        f.write("Engineer,https://www.indeed.com/viewjob?jk=2,Ind")
+    with JobStore(db) as store:
+        assert [job["url"] for job in store.iter_jobs()] == ["https://www.indeed.com/viewjob?jk=1"]
+
+    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+        f.write("eed,Yes\n")
+    with JobStore(db) as store:
+        assert store.has_applied({"url": "https://www.indeed.com/viewjob?jk=2"})
+        assert store.count() == 2
@@ -0,0 +1,164 @@
+# utils/browser.py
+import argparse
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_HOME = "https://www.linkedin.com"
+
+# ChromeDriver resolution cache: webdriver-manager is only consulted when the cached
+# binary is missing, older than the TTL, or doesn't match the pinned version
+DRIVER_CACHE_FILE = os.getenv("CHROMEDRIVER_CACHE_FILE", os.path.join("data", "chromedriver.json"))
+DRIVER_CACHE_TTL = float(os.getenv("CHROMEDRIVER_CACHE_TTL", str(7 * 24 * 3600)))
+PINNED_DRIVER_VERSION = os.getenv("CHROMEDRIVER_VERSION")
+STARTUP_LOG = os.path.join("data", "browser_startup.jsonl")
+
+# Flags for the fast headless launch mode: skip first-run work, background services and image decoding
+FAST_HEADLESS_ARGUMENTS = [
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+]
+
+_resolved = {}
+_resolve_lock = threading.Lock()
+
+
+def _read_driver_cache():
+    try:
+        with open(DRIVER_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_driver_cache(entry):
+    os.makedirs(os.path.dirname(DRIVER_CACHE_FILE) or ".", exist_ok=True)
+    tmp = DRIVER_CACHE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp, DRIVER_CACHE_FILE)
+
+
+# Returns (driver_path, cache_hit)
+def resolve_chromedriver(version=PINNED_DRIVER_VERSION, ttl=DRIVER_CACHE_TTL):
+    with _resolve_lock:
+        if version in _resolved:
+            return _resolved[version], True
+        entry = _read_driver_cache()
+        if (entry and os.path.isfile(entry.get("path", ""))
+                and entry.get("version") == version
+                and time.time() - entry.get("resolved_at", 0) < ttl):
+            _resolved[version] = entry["path"]
+            return entry["path"], True
+
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        manager = ChromeDriverManager(driver_version=version) if version else ChromeDriverManager()
+        path = manager.install()
+        _write_driver_cache({"path": path, "version": version, "resolved_at": time.time()})
+        _resolved[version] = path
+        logger.info(f"Resolved ChromeDriver at {path}")
+        return path, False
+
+
+def _log_startup(entry):
+    logger.info(
+        f"Browser {entry['mode']} start: driver resolve {entry['resolve_s']:.2f}s, "
+        f"Chrome launch {entry['launch_s']:.2f}s"
+    )
+    try:
+        os.makedirs(os.path.dirname(STARTUP_LOG), exist_ok=True)
+        with open(STARTUP_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        logger.debug(f"Could not record startup time: {e}")
+
+
+# Start Chrome; profile_dir keeps cookies and local storage between runs.
+# fast=True uses the tuned headless flags and doesn't wait for images and subresources on navigation.
+def new_chrome(headless=False, profile_dir=None, arguments=(), stealth=False, fast=False):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    started = time.monotonic()
+    driver_path, cache_hit = resolve_chromedriver()
+    resolved = time.monotonic()
+
+    chrome_options = Options()
+    if fast:
+        for argument in FAST_HEADLESS_ARGUMENTS:
+            chrome_options.add_argument(argument)
+        chrome_options.page_load_strategy = "eager"
+    elif headless:
+        chrome_options.add_argument("--headless")
+    for argument in arguments:
+        if argument not in chrome_options.arguments:
+            chrome_options.add_argument(argument)
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    if stealth:
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option("useAutomationExtension", False)
+
+    driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+    if stealth:
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+    _log_startup({
+        "time": datetime.datetime.now().isoformat(),
+        "mode": "warm" if cache_hit else "cold",
+        "fast": fast,
+        "resolve_s": round(resolved - started, 3),
+        "launch_s": round(time.monotonic() - resolved, 3),
+    })
+    metrics.record("driver_init", time.monotonic() - started, "warm" if cache_hit else "cold")
+    return driver
+
+
+def driver_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+# python -m utils.browser: measure a cold start (empty driver cache) against a warm one
+def main():
+    parser = argparse.ArgumentParser(description="Measure browser cold and warm start times")
+    parser.add_argument("--no-fast", action="store_true", help="Use the default launch flags instead of fast headless")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if os.path.exists(DRIVER_CACHE_FILE):
+        os.remove(DRIVER_CACHE_FILE)
+    _resolved.clear()
+    for label in ("cold", "warm"):
+        started = time.monotonic()
+        driver = new_chrome(headless=True, fast=not args.no_fast)
+        ready = time.monotonic() - started
+        driver.quit()
+        print(f"{label} start: {ready:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
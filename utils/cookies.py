@@ -0,0 +1,23 @@
+# utils/cookies.py
+import json
+import os
+import time
+
+# Browser session pools (utils.sessions) keep their Chrome profiles and saved cookies here. This
+# module has no Selenium imports, so HTTP-only code can read the cookies without a browser stack.
+SESSION_DIR = os.getenv("BROWSER_SESSION_DIR", os.path.join("data", "sessions"))
+
+
+def cookie_file(name):
+    return os.path.join(SESSION_DIR, name, "cookies.json")
+
+
+# Unexpired cookies a session pool saved for the site, e.g. to log an HTTP client in without a browser
+def saved_cookies(name):
+    try:
+        with open(cookie_file(name), encoding="utf-8") as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return []
+    now = time.time()
+    return [cookie for cookie in cookies if not cookie.get("expiry") or cookie["expiry"] >= now]
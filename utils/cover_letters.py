@@ -0,0 +1,275 @@
+# utils/cover_letters.py
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import metrics, percentile
+
+
+API_URL = "https://api.x.ai/v1/grok/generate"  # Placeholder xAI API endpoint
+MODEL = "grok-3"
+MAX_CONCURRENCY = int(os.getenv("COVER_LETTER_CONCURRENCY", "4"))
+MAX_RETRIES = int(os.getenv("COVER_LETTER_RETRIES", "3"))
+REQUEST_TIMEOUT = 30
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+CACHE_DIR = os.getenv("COVER_LETTER_CACHE_DIR", os.path.join("data", "cover_letters"))
+CACHE_MEMORY_ENTRIES = int(os.getenv("COVER_LETTER_CACHE_SIZE", "256"))
+CACHE_DISK_BYTES = int(float(os.getenv("COVER_LETTER_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+
+def letter_key(*parts):
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# Content-addressed cover letter cache: an in-memory LRU in front of a directory of
+# <hash>.txt files. The disk tier evicts least recently used files once it grows past
+# its byte budget.
+class LetterCache:
+    def __init__(self, directory=CACHE_DIR, memory_entries=CACHE_MEMORY_ENTRIES, disk_bytes=CACHE_DISK_BYTES):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_size = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+        path = self.path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        with self._lock:
+            self._remember(key, text)
+            if self._disk_size is not None:
+                self._disk_size += os.path.getsize(path)
+        self._evict()
+        return path
+
+    def get_or_create(self, key, create):
+        text = self.get(key)
+        if text is None:
+            with metrics.span("cover_letter", "template"):
+                text = create()
+            if text:
+                self.put(key, text)
+        return text
+
+    def _scan(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".txt"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            if self._disk_size is not None and self._disk_size <= self.disk_bytes:
+                return
+            entries = self._scan()
+            self._disk_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if self._disk_size <= self.disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._disk_size -= size
+                key = os.path.basename(path)[:-4]
+                self._memory.pop(key, None)
+
+    def summary(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            rate = (self.memory_hits + self.disk_hits) / lookups * 100 if lookups else 0.0
+            return (
+                f"Cover letter cache: {self.memory_hits} memory hit(s), {self.disk_hits} disk hit(s), "
+                f"{self.misses} miss(es) ({rate:.0f}% hit rate)"
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_letter_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LetterCache()
+        return _cache
+
+
+def build_prompt(company, position, user_skills):
+    return f"""Generate a professional cover letter for a {position} position at {company}.
+        Highlight my skills in {user_skills}. Keep it concise, under 200 words, and address it to 'Hiring Manager'."""
+
+
+def fallback_letter(company, position, user_skills):
+    return f"""Dear Hiring Manager,
+
+I am excited to apply for the {position} position at {company}. With my skills in {user_skills}, I am confident in my ability to contribute to your team. [Add specific details about your experience].
+
+Sincerely,
+[Your Name]"""
+
+
+class RetryableError(Exception):
+    pass
+
+
+# Generates cover letters on a thread pool over one pooled HTTP session. prefetch() starts a
+# letter in the background as soon as a job is known; get() returns it (waiting only if it
+# is still in flight). Failed calls are retried with exponential backoff, then fall back to
+# the template letter.
+class CoverLetterService:
+    def __init__(self, api_key, user_skills, max_workers=MAX_CONCURRENCY, retries=MAX_RETRIES, backoff=1.0, cache=None):
+        self.cache = cache or get_letter_cache()
+        self.api_key = api_key
+        self.user_skills = user_skills
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cover-letter")
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.tokens = 0
+        self.api_calls = 0
+        self.retried = 0
+        self.fallbacks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def prefetch(self, key, company, position):
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = self._executor.submit(self._generate, company, position)
+            return future
+
+    def get(self, key, company, position):
+        return self.prefetch(key, company, position).result()
+
+    def _call_api(self, prompt):
+        payload = {"model": MODEL, "prompt": prompt, "max_tokens": 300}
+        response = self.session.post(API_URL, json=payload, timeout=REQUEST_TIMEOUT)
+        if response.status_code in RETRY_STATUS:
+            raise RetryableError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        data = response.json()
+        text = data.get("choices", [{}])[0].get("text", "")
+        if not text:
+            raise RetryableError("Empty response from API")
+        usage = data.get("usage") or {}
+        tokens = usage.get("total_tokens") or len(prompt.split()) + len(text.split())
+        return text.strip(), tokens
+
+    def _generate(self, company, position):
+        if not self.api_key:
+            with self._lock:
+                self.fallbacks += 1
+            return fallback_letter(company, position, self.user_skills)
+        prompt = build_prompt(company, position, self.user_skills)
+        key = letter_key("ai", MODEL, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        print(f"Generating cover letter for {position} at {company}")
+        for attempt in range(self.retries + 1):
+            started = time.monotonic()
+            try:
+                text, tokens = self._call_api(prompt)
+            except (RetryableError, requests.ConnectionError, requests.Timeout) as e:
+                metrics.record("cover_letter", time.monotonic() - started, "api", ok=False)
+                error = e
+            except Exception as e:
+                metrics.record("cover_letter", time.monotonic() - started, "api", ok=False)
+                error = e
+                break
+            else:
+                metrics.record("cover_letter", time.monotonic() - started, "api")
+                with self._lock:
+                    self.api_calls += 1
+                    self.latencies.append(time.monotonic() - started)
+                    self.tokens += tokens
+                print(f"API-generated cover letter for {company}")
+                self.cache.put(key, text)
+                return text
+            if attempt < self.retries:
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.backoff * (2 ** attempt) + random.uniform(0, self.backoff))
+        print(f"API error for {company}: {error}. Using fallback template.")
+        with self._lock:
+            self.fallbacks += 1
+        return fallback_letter(company, position, self.user_skills)
+
+    def report(self):
+        with self._lock:
+            return (
+                f"Cover letters: {self.api_calls} API call(s), {self.tokens} token(s), "
+                f"{self.retried} retr{'y' if self.retried == 1 else 'ies'}, {self.fallbacks} fallback(s); "
+                f"latency p50 {percentile(self.latencies, 50):.2f}s, p95 {percentile(self.latencies, 95):.2f}s. "
+                f"{self.cache.summary()}"
+            )
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
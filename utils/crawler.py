@@ -0,0 +1,128 @@
+# utils/crawler.py
+import logging
+import os
+import queue
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from utils import waits
+from utils.dedupe import canonical_url
+from utils.metrics import metrics
+from utils.ratelimit import domain_of
+
+logger = logging.getLogger(__name__)
+
+# Result pages the crawler may load ahead of the one being worked on, and where it gives up
+CRAWL_PREFETCH_PAGES = int(os.getenv("CRAWL_PREFETCH_PAGES", "1"))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "40"))
+
+
+# Deep link to a result page: page 1 is the search URL itself, later pages set start=<offset>
+def page_url(url, page, page_size):
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != "start"]
+    if page > 1:
+        query.append(("start", str((page - 1) * page_size)))
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+# Walks search result pages on its own thread with a dedicated driver and queues (page, jobs)
+# for the consumer, jobs being the utils.models.Job list extract(driver) read. Pages are opened from start= deep links rather than by clicking the pager,
+# so page N+1 loads while page N is being applied to. The queue is bounded: once `prefetch`
+# pages are waiting the crawler stops loading until the consumer takes one. The crawl ends at
+# an empty page, a page with nothing new (LinkedIn repeats the last page past the end) or
+# max_pages; an error on the crawler thread is raised to the consumer after the queued pages.
+class PageCrawler:
+    def __init__(self, driver, url, extract, card_selector, page_size=25, start_page=1,
+                 max_pages=CRAWL_MAX_PAGES, prefetch=CRAWL_PREFETCH_PAGES):
+        self.driver = driver
+        self.url = url
+        self.extract = extract
+        self.card_selector = card_selector
+        self.page_size = page_size
+        self.start_page = start_page
+        self.max_pages = max_pages
+        self.error = None
+        self.pages_loaded = 0
+        self._queue = queue.Queue(maxsize=max(1, prefetch))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def __iter__(self):
+        self.start()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            yield item
+        if self.error:
+            raise self.error
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="page-crawler", daemon=True)
+            self._thread.start()
+
+    # Stop crawling; pages still queued are dropped. Returns once the driver is free again.
+    def stop(self):
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._thread is not None:
+            self._thread.join()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _load(self, page):
+        source = domain_of(self.url)
+        with metrics.span("search", source):
+            waits.open_page(self.driver, page_url(self.url, page, self.page_size))
+            self.pages_loaded += 1
+            try:
+                waits.wait_all_present(self.driver, (By.CSS_SELECTOR, self.card_selector))
+            except TimeoutException:
+                return []
+        with metrics.span("parse", source):
+            return self.extract(self.driver)
+
+    def _run(self):
+        seen = set()
+        try:
+            for page in range(self.start_page, self.start_page + self.max_pages):
+                if self._stop.is_set():
+                    break
+                jobs = self._load(page)
+                new = [job for job in jobs if (canonical_url(job.url) or job.url) not in seen]
+                if not new:
+                    logger.info(f"No new results on page {page}, crawl finished")
+                    break
+                seen.update(canonical_url(job.url) or job.url for job in new)
+                logger.debug(f"Queued {len(new)} job(s) from page {page}")
+                if not self._put((page, new)):
+                    break
+            else:
+                logger.info(f"Stopped crawling after {self.max_pages} page(s)")
+        except Exception as e:
+            logger.warning(f"Crawler stopped on an error: {e}")
+            self.error = e
+        finally:
+            self._put(None)
@@ -0,0 +1,205 @@
+# utils/dedupe.py
+import hashlib
+import logging
+import re
+import unicodedata
+
+from utils.storage import canonical_url, clean_value, job_id
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+COMPANY_SUFFIXES = {"inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "gmbh", "plc", "sa", "ag", "bv"}
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "jr": "junior", "eng": "engineer", "engr": "engineer", "dev": "developer",
+    "mgr": "manager", "swe": "software engineer", "ml": "machine learning", "ii": "2", "iii": "3",
+}
+REMOTE_WORDS = {"remote", "anywhere", "worldwide", "work from home", "wfh"}
+
+# SimHash settings: descriptions whose 64-bit hashes differ in at most SIMHASH_DISTANCE bits are
+# near-duplicates. Splitting the hash into SIMHASH_DISTANCE + 1 bands guarantees two such hashes
+# share at least one band exactly, so candidates come from a bucket lookup, not a full scan.
+# Job descriptions are short, so word pairs and a looser distance than the usual 3 bits separate
+# reworded reposts from different roles best.
+SIMHASH_DISTANCE = 6
+SIMHASH_BANDS = SIMHASH_DISTANCE + 1
+SIMHASH_MIN_WORDS = 20
+SHINGLE_SIZE = 2
+
+
+def _words(text):
+    # The scrapers' "N/A" placeholder is a missing value, not a company, title or place
+    text = clean_value(text) or ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return _WORD.findall(text.lower())
+
+
+def normalize_company(company):
+    words = _words(company)
+    while words and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def normalize_title(title):
+    words = []
+    for word in _words(re.sub(r"\([^)]*\)", " ", title or "")):
+        words.append(TITLE_ABBREVIATIONS.get(word, word))
+    return " ".join(words)
+
+
+def normalize_location(location):
+    text = " ".join(_words(location))
+    if not text or any(word in text for word in REMOTE_WORDS):
+        return "remote" if text else ""
+    # "San Francisco, CA, United States" and "San Francisco, CA" are the same place
+    return " ".join(_words(location.split(",")[0])) if location else ""
+
+
+# (company, title, location) fingerprint; None when there isn't enough to go on
+def fingerprint(job):
+    company = normalize_company(job.get("company"))
+    title = normalize_title(job.get("title"))
+    if not company or not title:
+        return None
+    key = "|".join((company, title, normalize_location(job.get("location"))))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def simhash(text, bits=64):
+    words = _words(text)
+    if len(words) < SIMHASH_MIN_WORDS:
+        return None
+    # Each distinct word is hashed once; a shingle's hash combines its words' hashes rotated by position
+    mask = (1 << bits) - 1
+    word_hashes = {
+        word: int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for word in set(words)
+    }
+    values = [word_hashes[word] for word in words]
+    shingles = set()
+    for i in range(len(values) - SHINGLE_SIZE + 1):
+        value = 0
+        for offset in range(SHINGLE_SIZE):
+            part = values[i + offset]
+            value ^= (part << offset | part >> (bits - offset)) & mask
+        shingles.add(value)
+    hashes = [format(value, f"0{bits}b") for value in shingles]
+    # Column-wise bit counts: bit i is set when most shingle hashes have it set
+    half = len(hashes) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in zip(*hashes)), 2)
+
+
+def _bands(value, bits=64, bands=SIMHASH_BANDS):
+    width = bits // bands
+    mask = (1 << width) - 1
+    return [(band, value >> (band * width) & mask) for band in range(bands)]
+
+
+# Jobs may be dicts, utils.models.Job records, other objects with job attributes, or
+# (title, link, source) tuples
+def as_job(job):
+    if isinstance(job, dict):
+        return job
+    if hasattr(job, "to_dict"):
+        return job.to_dict()
+    if isinstance(job, tuple):
+        return dict(zip(("title", "url", "source"), job))
+    return {key: getattr(job, key, None) for key in ("id", "url", "title", "company", "location", "source", "description")}
+
+
+def dedupe_keys(job):
+    job = as_job(job)
+    return canonical_url(job.get("url")), fingerprint(job), simhash(job.get("description"))
+
+
+# Incremental duplicate index over canonical URLs, fingerprints and description SimHashes.
+# Lookups are O(1) plus a small bucket scan for SimHash. from_store() reads the keys the store
+# has already computed and only hashes jobs added since, so a run is one pass over the history
+# plus one lookup per new job. A job is never a duplicate of its own stored record.
+class Deduper:
+    def __init__(self, distance=SIMHASH_DISTANCE):
+        self.distance = distance
+        self._urls = {}
+        self._fingerprints = {}
+        self._bands = {}
+        self.size = 0
+
+    def check_keys(self, id_, url, key, value):
+        for index, lookup in ((self._urls, url), (self._fingerprints, key)):
+            original = index.get(lookup) if lookup else None
+            if original is not None and original != id_:
+                return original
+        if value is not None:
+            for band in _bands(value):
+                for other, other_id in self._bands.get(band, ()):
+                    if other_id != id_ and bin(value ^ other).count("1") <= self.distance:
+                        return other_id
+        return None
+
+    def add_keys(self, id_, url, key, value):
+        if url:
+            self._urls.setdefault(url, id_)
+        if key:
+            self._fingerprints.setdefault(key, id_)
+        if value is not None:
+            for band in _bands(value):
+                self._bands.setdefault(band, []).append((value, id_))
+        self.size += 1
+
+    # id of the job this one duplicates, or None
+    def check(self, job):
+        job = as_job(job)
+        return self.check_keys(job_id(job), *dedupe_keys(job))
+
+    def add(self, job, id_=None):
+        job = as_job(job)
+        self.add_keys(id_ or job_id(job), *dedupe_keys(job))
+
+    # Splits jobs into (unique, duplicates); duplicates are (job, id of the original) pairs.
+    # Unique jobs are added to the index, so later batches are checked against them too.
+    def dedupe(self, jobs):
+        unique, duplicates = [], []
+        batch = set()
+        for job in jobs:
+            record = as_job(job)
+            id_ = job_id(record)
+            keys = dedupe_keys(record)
+            original = id_ if id_ in batch else self.check_keys(id_, *keys)
+            if original is None:
+                batch.add(id_)
+                self.add_keys(id_, *keys)
+                unique.append(job)
+            else:
+                duplicates.append((job, original))
+        if duplicates:
+            logger.info(f"Dropped {len(duplicates)} duplicate job(s), kept {len(unique)}")
+        return unique, duplicates
+
+    # statuses limits the stored jobs that count as originals, e.g. to the ones already applied
+    # to, so a stored job still waiting for an application is not dropped as its own repost
+    @classmethod
+    def from_store(cls, store, statuses=None, **kwargs):
+        deduper = cls(**kwargs)
+        for id_, keys in stored_dedupe_keys(store, statuses).items():
+            deduper.add_keys(id_, *keys)
+        return deduper
+
+
+# id -> (canonical url, fingerprint, simhash) for every stored job, or those in `statuses`. Keys
+# are persisted in the store, so only jobs added or updated since the last call are hashed.
+def stored_dedupe_keys(store, statuses=None):
+    computed = [(job["id"], *dedupe_keys(job)) for job in store.jobs_without_dedupe_keys()]
+    if computed:
+        store.save_dedupe_keys(computed)
+        logger.info(f"Computed dedupe keys for {len(computed)} job(s)")
+    return {id_: (url, key, value) for id_, url, key, value in store.dedupe_keys(statuses)}
+
+
+# Drop duplicates within jobs and against everything already in the store
+def dedupe_against_store(jobs, store):
+    unique, _ = Deduper.from_store(store).dedupe(jobs)
+    return unique
@@ -0,0 +1,48 @@
+# utils/extract.py
+import os
+from urllib.parse import urljoin
+
+from utils.parsing import CARD_SELECTOR
+
+# "browser" reads every card on a results page with one execute_script call;
+# "html" pulls driver.page_source and parses it with utils.parsing
+EXTRACT_MODE = os.getenv("CARD_EXTRACT_MODE", "browser")
+
+# Same field format as utils.parsing: key -> (css selector or None for the card itself, attribute or None for text)
+_CARDS_JS = """
+const [cardSelector, fields] = arguments;
+const read = (root, selector, attribute) => {
+  const el = selector ? root.querySelector(selector) : root;
+  if (!el) return null;
+  if (attribute) return el.getAttribute(attribute);
+  return el.textContent.replace(/\\s+/g, " ").trim();
+};
+return Array.from(document.querySelectorAll(cardSelector), card => {
+  const out = {};
+  for (const [key, [selector, attribute]] of Object.entries(fields)) {
+    out[key] = read(card, selector, attribute);
+  }
+  return out;
+});
+"""
+
+
+def _js_fields(fields):
+    return {key: [selector, attribute] for key, (selector, attribute) in fields.items()}
+
+
+# One WebDriver round trip per results page instead of one per card and field
+def extract_cards_in_browser(driver, fields, card_selector=CARD_SELECTOR):
+    return driver.execute_script(_CARDS_JS, card_selector, _js_fields(fields)) or []
+
+
+# Read several fields of the current page in one round trip; selectors are relative to the document
+def extract_fields_in_browser(driver, fields):
+    cards = driver.execute_script(_CARDS_JS, "html", _js_fields(fields)) or [{}]
+    return cards[0]
+
+
+def absolute_url(href, base="https://www.linkedin.com"):
+    if not href:
+        return None
+    return urljoin(base, href).split("?")[0]
@@ -0,0 +1,256 @@
+# utils/filters.py
+import os
+import re
+
+from utils.metrics import metrics
+
+# Fields a rule can look at. Jobs may be utils.models.Job records, dicts, other objects with
+# these attributes, or legacy (title, link, source) tuples, which only have a title.
+# Field text is lowercased once per job so the patterns don't need re.IGNORECASE,
+# which would disable the regex engine's literal-prefix scan.
+FIELDS = ("title", "company", "location", "description")
+_TUPLE_FIELDS = {"title": 0}
+
+
+def job_field(job, name):
+    if isinstance(job, dict):
+        value = job.get(name)
+    elif isinstance(job, tuple):
+        index = _TUPLE_FIELDS.get(name)
+        value = job[index] if index is not None and index < len(job) else None
+    else:
+        value = getattr(job, name, None)
+    return value.lower() if value else ""
+
+
+# A keyword rule. Keyword strings accept a small syntax, so rule lists can live in config:
+#   "python"              include, matched on the title as a whole word
+#   "-senior" / "!senior" exclude (negation)
+#   "company:acme"        match another field (title, company, location, description)
+#   "python^3"            weight 3 towards the score
+#   "engineer*"           prefix match: no word boundary at the end
+class Rule:
+    def __init__(self, keyword, field="title", weight=1.0, exclude=False, word_boundary=True):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown filter field: {field}")
+        self.keyword = keyword.strip().lower()
+        # An empty keyword would compile to a zero-width pattern that matches everywhere
+        if not self.keyword:
+            raise ValueError(f"Empty filter keyword: {keyword!r}")
+        self.field = field
+        self.weight = weight
+        self.exclude = exclude
+        self.word_boundary = word_boundary
+
+    @classmethod
+    def parse(cls, spec, exclude=False):
+        original, spec = spec, spec.strip()
+        if spec[:1] in ("-", "!"):
+            spec, exclude = spec[1:], True
+        field = "title"
+        prefix, sep, rest = spec.partition(":")
+        if sep and prefix.lower() in FIELDS:
+            field, spec = prefix.lower(), rest
+        weight = 1.0
+        keyword, sep, rest = spec.rpartition("^")
+        if sep:
+            try:
+                weight, spec = float(rest), keyword
+            except ValueError:
+                pass
+        word_boundary = not spec.endswith("*")
+        if not spec.rstrip("*").strip():
+            raise ValueError(f"Filter rule has no keyword: {original!r}")
+        return cls(spec.rstrip("*"), field=field, weight=weight, exclude=exclude, word_boundary=word_boundary)
+
+    def __repr__(self):
+        sign = "-" if self.exclude else ""
+        return f"Rule({sign}{self.field}:{self.keyword}^{self.weight:g})"
+
+
+# Compile keywords into one trie-shaped alternation: shared prefixes are matched once,
+# so the regex engine never retries every keyword at every position
+def _trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if end else group
+
+    return build(trie)
+
+
+# The leading word boundary is checked in Python rather than in the pattern: a pattern that
+# starts with a literal lets the regex engine skip straight to candidate positions
+def _compile(rules):
+    whole = sorted({rule.keyword for rule in rules if rule.word_boundary})
+    prefix = sorted({rule.keyword for rule in rules if not rule.word_boundary})
+    parts = []
+    if whole:
+        parts.append(_trie_pattern(whole) + r"(?!\w)")
+    if prefix:
+        parts.append(_trie_pattern(prefix))
+    if not parts:
+        return None
+    return re.compile("|".join(parts))
+
+
+def _word_start(text, start):
+    return not start or not (text[start - 1].isalnum() or text[start - 1] == "_")
+
+
+def _search(pattern, text):
+    match = pattern.search(text)
+    while match is not None:
+        start = match.start()
+        if _word_start(text, start):
+            return True
+        # search() clamps a position past the end back to len(text), which would loop forever
+        if start >= len(text):
+            break
+        match = pattern.search(text, start + 1)
+    return False
+
+
+# Filter engine: every field gets one compiled regex for its include keywords and one for
+# its excludes. A job is rejected as soon as any exclude matches; otherwise its score is the
+# sum of the weights of the distinct include keywords found. Scoring searches each keyword on
+# its own, since the combined alternation only reports the longest of overlapping keywords. It passes at min_score, or by
+# default with a positive score; with no include rules every job that isn't excluded passes.
+class JobFilter:
+    def __init__(self, include=(), exclude=(), rules=(), min_score=None):
+        self.rules = [Rule.parse(spec) for spec in include]
+        self.rules += [Rule.parse(spec, exclude=True) for spec in exclude]
+        self.rules += list(rules)
+        self._include = {}
+        self._exclude = {}
+        self._scorers = {}
+        for field in FIELDS:
+            include_rules = [r for r in self.rules if r.field == field and not r.exclude]
+            exclude_rules = [r for r in self.rules if r.field == field and r.exclude]
+            if include_rules:
+                self._include[field] = _compile(include_rules)
+                # A keyword listed twice counts once, with its last weight
+                weights = {(r.keyword, r.word_boundary): r.weight for r in include_rules}
+                self._scorers[field] = [
+                    (_compile([Rule(keyword, field, word_boundary=word_boundary)]), weight)
+                    for (keyword, word_boundary), weight in weights.items()
+                ]
+            if exclude_rules:
+                self._exclude[field] = _compile(exclude_rules)
+        self.min_score = min_score
+        # Without a threshold and with only positive weights, any include hit passes,
+        # so matches() can stop at the first hit instead of scoring
+        self._search_only = min_score is None and all(r.weight > 0 for r in self.rules if not r.exclude)
+        fields = {r.field for r in self.rules}
+        self._single_field = fields.pop() if len(fields) == 1 else None
+
+    def excluded(self, job):
+        for field, pattern in self._exclude.items():
+            if _search(pattern, job_field(job, field)):
+                return True
+        return False
+
+    # Score of a job, or None if an exclude rule matched
+    def score(self, job):
+        if self.excluded(job):
+            return None
+        total = 0.0
+        for field, pattern in self._include.items():
+            text = job_field(job, field)
+            # Most jobs miss every keyword; one combined search rules them out before the per-keyword ones
+            if not _search(pattern, text):
+                continue
+            for keyword_pattern, weight in self._scorers[field]:
+                if _search(keyword_pattern, text):
+                    total += weight
+        return total
+
+    def _passes(self, score):
+        if score is None:
+            return False
+        if self.min_score is not None:
+            return score >= self.min_score
+        return score > 0 or not self._include
+
+    def matches(self, job):
+        if not self._search_only:
+            return self._passes(self.score(job))
+        if self.excluded(job):
+            return False
+        if not self._include:
+            return True
+        for field, pattern in self._include.items():
+            if _search(pattern, job_field(job, field)):
+                return True
+        return False
+
+    def filter(self, jobs):
+        with metrics.span("filter"):
+            return self._filter(jobs)
+
+    def _filter(self, jobs):
+        if not (self._search_only and self._single_field):
+            return [job for job in jobs if self.matches(job)]
+        # Common case (plain keyword lists on one field): one lowercase and at most two searches per job
+        field = self._single_field
+        include, exclude = self._include.get(field), self._exclude.get(field)
+        filtered = []
+        for job in jobs:
+            text = job_field(job, field)
+            if exclude is not None and _search(exclude, text):
+                continue
+            if include is None or _search(include, text):
+                filtered.append(job)
+        return filtered
+
+    # Passing jobs with their scores, best first
+    def rank(self, jobs):
+        scored = []
+        for job in jobs:
+            score = self.score(job)
+            if self._passes(score):
+                scored.append((score, job))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored
+
+
+_filters = {}
+
+
+# Filters are cached by their keyword lists, so callers can build them per call for free
+def get_filter(include=(), exclude=(), min_score=None):
+    key = (tuple(include), tuple(exclude), min_score)
+    job_filter = _filters.get(key)
+    if job_filter is None:
+        job_filter = _filters[key] = JobFilter(include, exclude, min_score=min_score)
+    return job_filter
+
+
+DEFAULT_INCLUDE = ["Python", "Junior", "Entry Level"]
+DEFAULT_EXCLUDE = ["Senior", "Lead*", "Principal"]
+
+
+# Comma-separated rule list from the environment, e.g. JOB_INCLUDE_KEYWORDS="python^2,company:acme"
+def keywords_from_env(name, default):
+    value = os.getenv(name)
+    if not value:
+        return list(default)
+    specs = [spec for spec in (part.strip() for part in value.split(",")) if spec]
+    for spec in specs:
+        try:
+            Rule.parse(spec)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from None
+    return specs
@@ -0,0 +1,156 @@
+# utils/http.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.cookies import saved_cookies
+from utils.ratelimit import get_limiter, is_challenge, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join("data", "http_cache"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "4"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+USER_AGENT = os.getenv(
+    "HTTP_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+)
+
+# A response that landed on one of these is a login wall or challenge, not a listing page
+BLOCKED_PATHS = ("/authwall", "/login", "/checkpoint/", "/uas/login")
+
+
+def is_blocked(response):
+    return response.status_code in (401, 403, 429, 999) or any(path in response.url for path in BLOCKED_PATHS)
+
+
+# Read-only page fetches over one pooled, keep-alive requests session. Cookies can come from a
+# browser SessionPool's saved login, so logged-in pages load without starting Chrome. Responses
+# with an ETag or Last-Modified are cached on disk and revalidated with If-None-Match /
+# If-Modified-Since, so an unchanged page costs a 304 and no transfer. get() returns None when
+# the page could not be fetched or came back as a login wall; callers fall back to the browser.
+# Every request waits on its site's utils.ratelimit limiter and reports back how it went.
+class HttpFetcher:
+    def __init__(self, cookies=(), pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, cache_dir=HTTP_CACHE_DIR):
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        self._lock = threading.Lock()
+        self.fetched = 0
+        self.not_modified = 0
+        self.blocked = 0
+        self.bytes = 0
+
+    # Fetcher logged in with the cookies the named browser session pool saved
+    @classmethod
+    def for_session(cls, name, **kwargs):
+        cookies = saved_cookies(name)
+        if not cookies:
+            logger.info(f"No saved {name} cookies; fetching pages logged out")
+        return cls(cookies=cookies, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _cache_path(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".json")
+
+    def _cached(self, url):
+        try:
+            with open(self._cache_path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, url, response):
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        if not any(validators.values()):
+            return
+        path = self._cache_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(validators, url=url, body=response.text), f)
+        os.replace(tmp, path)
+
+    def get(self, url, params=None):
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+        cached = self._cached(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        limiter = get_limiter(url)
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            limiter.record(latency=time.monotonic() - started)
+            logger.warning(f"Could not fetch {url}: {e}")
+            return None
+        limiter.record(
+            latency=time.monotonic() - started,
+            status=response.status_code,
+            challenged=is_challenge(response.url),
+            retry_after=retry_after_seconds(response.headers.get("Retry-After")),
+        )
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self.not_modified += 1
+            return cached["body"]
+        if is_blocked(response):
+            with self._lock:
+                self.blocked += 1
+            logger.warning(f"{url} answered with a login wall or throttle ({response.status_code}, {response.url})")
+            return None
+        if response.status_code != 200:
+            logger.warning(f"Could not fetch {url}: HTTP {response.status_code}")
+            return None
+        with self._lock:
+            self.fetched += 1
+            self.bytes += len(response.content)
+        self._save(url, response)
+        return response.text
+
+    # Fetch several pages concurrently over the pooled connections; results keep the order of urls
+    def get_many(self, urls):
+        with ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="http-fetch") as executor:
+            return list(executor.map(self.get, urls))
+
+    def summary(self):
+        return (
+            f"HTTP: {self.fetched} page(s) fetched ({self.bytes / 1024:.0f} KiB), "
+            f"{self.not_modified} unchanged, {self.blocked} blocked"
+        )
+
+    def close(self):
+        self.session.close()
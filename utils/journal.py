@@ -0,0 +1,115 @@
+# utils/journal.py
+import datetime
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", os.path.join("data", "journal"))
+
+# Job states that mean the job was handled and must not be opened again on resume. A job left
+# "started" never finished (its browser crashed, or the run stopped) and is tried again.
+DONE_STATES = {"applied", "skipped", "failed"}
+
+
+# Append-only checkpoint journal for one kind of run (one JSON line per event, fsynced).
+# It records the search cursor and each job's state transitions. Replaying the file on start
+# tells a restarted run where the last one stopped; finish() closes the run so the next one
+# starts fresh. A torn last line from a crash mid-write is ignored.
+class Journal:
+    def __init__(self, name, directory=JOURNAL_DIR):
+        self.name = name
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self._lock = threading.Lock()
+        self.cursor = None
+        self.states = {}
+        self._load()
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        if data and not data.endswith(b"\n"):
+            # Drop the torn tail so new events start on a fresh line
+            data = data[:data.rfind(b"\n") + 1]
+            with open(self.path, "r+b") as f:
+                f.truncate(len(data))
+        for line in data.decode("utf-8").splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event["type"] == "cursor":
+                self.cursor = event["cursor"]
+            elif event["type"] == "job":
+                self.states[event["key"]] = event["state"]
+        if self.cursor or self.states:
+            logger.info(f"Resuming {self.name}: {self.count('applied')} applied, {len(self.states)} job(s) seen, cursor {self.cursor}")
+
+    @property
+    def resuming(self):
+        return self.cursor is not None or bool(self.states)
+
+    def _append(self, event):
+        event["time"] = datetime.datetime.now().isoformat()
+        with self._lock:
+            # Opened on the first event, so a finished or idle journal holds no handle
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(event) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    # Search position, e.g. query/url and page; jobs already handled on that page are skipped by
+    # their done state, so the cursor needs no position within the page
+    def set_cursor(self, **cursor):
+        self.cursor = cursor
+        self._append({"type": "cursor", "cursor": cursor})
+
+    def transition(self, key, state, **info):
+        with self._lock:
+            self.states[key] = state
+        self._append(dict(info, type="job", key=key, state=state))
+
+    def state(self, key):
+        return self.states.get(key)
+
+    def done(self, key):
+        return self.states.get(key) in DONE_STATES
+
+    def count(self, state):
+        return sum(1 for value in list(self.states.values()) if value == state)
+
+    def keys(self, state):
+        return [key for key, value in list(self.states.items()) if value == state]
+
+    # The run completed: keep the file as <name>.<timestamp>.done.jsonl for reference and start over
+    def finish(self):
+        with self._lock:
+            self._close()
+            if os.path.exists(self.path):
+                stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+                os.replace(self.path, self.path[:-len(".jsonl")] + f".{stamp}.done.jsonl")
+            self.cursor = None
+            self.states = {}
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self._lock:
+            self._close()
@@ -0,0 +1,56 @@
+# utils/listings.py
+import logging
+import os
+
+from utils.extract import absolute_url
+from utils.http import HttpFetcher
+from utils.metrics import metrics
+from utils.models import Job
+from utils.parsing import extract_cards, save_page
+
+logger = logging.getLogger(__name__)
+
+# LinkedIn's public search fragment: plain <li> cards, no JavaScript, paged with start=
+LINKEDIN_GUEST_SEARCH = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+LINKEDIN_GUEST_CARD_FIELDS = {
+    "title": ("h3.base-search-card__title", None),
+    "company": ("h4.base-search-card__subtitle", None),
+    "location": ("span.job-search-card__location", None),
+    "href": ("a.base-card__full-link", "href"),
+}
+HTTP_SEARCH_PAGES = int(os.getenv("HTTP_SEARCH_PAGES", "4"))
+
+# CARD_EXTRACT_MODE-style switch for discovery: "http" tries plain HTTP first and only starts
+# a browser when that fails; "browser" always uses Selenium
+DISCOVERY_MODE = os.getenv("DISCOVERY_MODE", "http")
+
+
+# Read-only LinkedIn search over HTTP. Returns a list of Job, or None when LinkedIn refused the
+# request so the caller can search in the browser instead.
+def fetch_linkedin_listings(query, location, pages=HTTP_SEARCH_PAGES, fetcher=None):
+    own_fetcher = fetcher is None
+    fetcher = fetcher or HttpFetcher.for_session("linkedin")
+    jobs = []
+    start = 0
+    try:
+        for _ in range(pages):
+            with metrics.span("search", "linkedin.com"):
+                html = fetcher.get(LINKEDIN_GUEST_SEARCH, params={"keywords": query, "location": location, "start": start})
+            if html is None:
+                return jobs or None
+            save_page(html, "linkedin")
+            with metrics.span("parse", "linkedin.com"):
+                cards = extract_cards(html, LINKEDIN_GUEST_CARD_FIELDS, card_selector="li")
+            if not cards:
+                break
+            for card in cards:
+                url = absolute_url(card["href"])
+                if card["title"] and url:
+                    jobs.append(Job(card["title"], url, "LinkedIn", company=card["company"], location=card["location"]))
+            start += len(cards)
+    finally:
+        if own_fetcher:
+            logger.info(fetcher.summary())
+            fetcher.close()
+    logger.info(f"Fetched {len(jobs)} LinkedIn listing(s) over HTTP")
+    return jobs
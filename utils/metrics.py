@@ -0,0 +1,147 @@
+# utils/metrics.py
+import atexit
+import collections
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Where export() writes the snapshot: a .json path gets JSON, anything else the Prometheus text
+# format (point node_exporter's textfile collector at it). Empty disables the export.
+METRICS_FILE = os.getenv("METRICS_FILE", os.path.join("data", "metrics.prom"))
+# Durations kept per stage and source for the percentiles; counts and sums cover every sample
+METRICS_MAX_SAMPLES = int(os.getenv("METRICS_MAX_SAMPLES", "1000"))
+QUANTILES = (0.5, 0.95)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Durations of the bots' stages (driver_init, login, search, parse, filter, cover_letter, apply,
+# write, notify, ...) per source, from any thread. span() times a block; record() takes a
+# duration measured elsewhere. A block that raises, or a record() with ok=False, also counts
+# as an error.
+class Metrics:
+    def __init__(self, max_samples=METRICS_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def record(self, stage, seconds, source="", ok=True):
+        with self._lock:
+            entry = self._stages.get((stage, source))
+            if entry is None:
+                entry = self._stages[(stage, source)] = {
+                    "samples": collections.deque(maxlen=self.max_samples), "count": 0, "sum": 0.0, "errors": 0,
+                }
+            entry["samples"].append(seconds)
+            entry["count"] += 1
+            entry["sum"] += seconds
+            if not ok:
+                entry["errors"] += 1
+
+    @contextlib.contextmanager
+    def span(self, stage, source=""):
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(stage, time.perf_counter() - started, source, ok)
+
+    def snapshot(self):
+        with self._lock:
+            stages = [(key, dict(entry, samples=list(entry["samples"]))) for key, entry in self._stages.items()]
+        return [
+            {
+                "stage": stage,
+                "source": source,
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "sum": round(entry["sum"], 6),
+                "p50": round(percentile(entry["samples"], 50), 6),
+                "p95": round(percentile(entry["samples"], 95), 6),
+                "max": round(max(entry["samples"]), 6),
+            }
+            for (stage, source), entry in sorted(stages)
+        ]
+
+    def to_json(self):
+        return json.dumps({"time": time.time(), "stages": self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP jobbot_stage_seconds Duration of each bot stage by source",
+            "# TYPE jobbot_stage_seconds summary",
+        ]
+        errors = []
+        for row in self.snapshot():
+            labels = f'stage="{_label(row["stage"])}",source="{_label(row["source"])}"'
+            for quantile in QUANTILES:
+                lines.append(f'jobbot_stage_seconds{{{labels},quantile="{quantile}"}} {row[f"p{round(quantile * 100)}"]}')
+            lines.append(f"jobbot_stage_seconds_sum{{{labels}}} {row['sum']}")
+            lines.append(f"jobbot_stage_seconds_count{{{labels}}} {row['count']}")
+            errors.append(f"jobbot_stage_errors_total{{{labels}}} {row['errors']}")
+        lines += ["# HELP jobbot_stage_errors_total Stage runs that failed", "# TYPE jobbot_stage_errors_total counter"]
+        return "\n".join(lines + errors) + "\n"
+
+    # Write the snapshot atomically, so a collector never reads a half-written file
+    def export(self, path=METRICS_FILE):
+        if not path:
+            return None
+        with self._lock:
+            if not self._stages:
+                return None
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return path
+
+    def summary(self):
+        rows = self.snapshot()
+        if not rows:
+            return "Stage timings: nothing recorded"
+        parts = []
+        for row in rows:
+            name = f"{row['stage']}[{row['source']}]" if row["source"] else row["stage"]
+            errors = f", {row['errors']} failed" if row["errors"] else ""
+            parts.append(f"{name} {row['count']}x p50 {row['p50']:.2f}s p95 {row['p95']:.2f}s{errors}")
+        return "Stage timings: " + "; ".join(parts)
+
+    def report(self, log=logger):
+        log.info(self.summary())
+
+
+metrics = Metrics()
+
+
+@atexit.register
+def export_metrics():
+    try:
+        path = metrics.export()
+    except OSError as e:
+        logger.warning(f"Could not write metrics to {METRICS_FILE}: {e}")
+        return
+    if path:
+        logger.debug(f"Wrote stage metrics to {path}")
@@ -0,0 +1,54 @@
+# utils/models.py
+import json
+import sys
+from dataclasses import dataclass
+
+FIELDS = ("title", "url", "source", "company", "location", "description")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# One job listing, as every source, bot and store call passes it around. Slots keep a record to
+# its fields with no per-instance __dict__, and source, company and location are interned, so
+# a backlog of thousands of jobs from a few boards and employers holds one copy of each string.
+# The store, the deduper, the keyword filters and the results CSV all take a Job as it is.
+@dataclass(slots=True)
+class Job:
+    title: str
+    url: str
+    source: str
+    company: str = None
+    location: str = None
+    description: str = None
+
+    def __post_init__(self):
+        self.source = _intern(self.source)
+        self.company = _intern(self.company)
+        self.location = _intern(self.location)
+
+    @classmethod
+    def from_dict(cls, job):
+        return cls(job.get("title"), job.get("url"), job.get("source"), job.get("company"), job.get("location"),
+                   job.get("description"))
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    # Job store record; empty fields are left out so they don't overwrite stored values
+    def to_dict(self):
+        record = {}
+        for name in FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                record[name] = value
+        return record
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    # CSV row for a header of field names; other columns are left empty
+    def to_row(self, columns):
+        return [getattr(self, column, None) or "" for column in columns]
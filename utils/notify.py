@@ -0,0 +1,317 @@
+# utils/notify.py
+import atexit
+import json
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+
+import requests
+
+from utils.metrics import metrics
+from utils.ratelimit import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+# Seconds spent gathering messages into one batch before sending
+NOTIFY_BATCH_WINDOW = float(os.getenv("NOTIFY_BATCH_WINDOW", "2"))
+# Delivery attempts per message; retries wait NOTIFY_BACKOFF seconds, doubling each time
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+NOTIFY_BACKOFF = float(os.getenv("NOTIFY_BACKOFF", "5"))
+# How long exit waits for a delivery already under way; anything undelivered goes to the outbox
+NOTIFY_EXIT_WAIT = float(os.getenv("NOTIFY_EXIT_WAIT", "10"))
+NOTIFY_OUTBOX = os.getenv("NOTIFY_OUTBOX", os.path.join("data", "outbox.jsonl"))
+# A logged-in SMTP connection is kept this long after its last message
+SMTP_IDLE_TIMEOUT = 60
+# Slack messages name the environment variable holding their webhook URL, never the URL itself,
+# so the secret is not written to the outbox
+SLACK_CHANNEL = "SLACK_WEBHOOK_URL"
+HTTP_TIMEOUT = 10
+
+_WAKE = object()
+
+
+class NotifyError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Merge messages for the same channel and recipient into one
+def merge(messages):
+    first = messages[0]
+    if len(messages) == 1:
+        return first
+    merged = dict(first, body="\n\n".join(message["body"] for message in messages), attempts=0,
+                  count=sum(message.get("count", 1) for message in messages))
+    if first["kind"] == "email":
+        merged["subject"] = f"{first['subject']} (+{len(messages) - 1} more)"
+    return merged
+
+
+# Sends email and Slack messages from a background thread so reporting never holds up a run.
+# Messages queued within batch_window seconds of each other are merged per recipient; emails go
+# over one logged-in SMTP connection that stays open between batches, Slack posts over one
+# requests session. A failed delivery is retried with exponential backoff on the worker thread.
+# At exit the worker gets exit_wait seconds to finish what it is sending without waiting out any
+# backoff; whatever is still undelivered is written to the outbox file and sent by the next run.
+class Notifier:
+    def __init__(self, sender=None, password=None, smtp_host=SMTP_HOST, smtp_port=SMTP_PORT,
+                 batch_window=NOTIFY_BATCH_WINDOW, max_attempts=NOTIFY_MAX_ATTEMPTS, backoff=NOTIFY_BACKOFF,
+                 outbox=NOTIFY_OUTBOX):
+        self.sender = sender
+        self.password = password
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.batch_window = batch_window
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.outbox = outbox
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._waiting = []
+        self._inflight = []
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._thread = None
+        self._smtp = None
+        self._smtp_used = 0.0
+        self._http = None
+
+    def email(self, to, subject, body):
+        if not (to and self.sender and self.password):
+            logger.info("Email is not configured, skipping notification")
+            return
+        self._put({"kind": "email", "to": to, "subject": subject, "body": body})
+
+    # channel is the name of the environment variable with the webhook URL
+    def slack(self, text, channel=SLACK_CHANNEL):
+        if not os.getenv(channel):
+            logger.info(f"{channel} is not set, skipping Slack notification")
+            return
+        self._put({"kind": "slack", "to": channel, "body": text})
+
+    def _put(self, message):
+        self._start()
+        self._queue.put(dict(message, attempts=0, due=0.0))
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            for message in self._load_outbox():
+                self._queue.put(message)
+            self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+            self._thread.start()
+
+    def _load_outbox(self):
+        # Claim the file first so two processes starting together don't both resend it
+        claimed = f"{self.outbox}.{os.getpid()}"
+        try:
+            os.replace(self.outbox, claimed)
+        except OSError:
+            return []
+        messages = []
+        with open(claimed, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    message = dict(json.loads(line), attempts=0, due=0.0)
+                except ValueError:
+                    continue
+                # Outboxes written before channels were named hold the webhook URL itself
+                if message["kind"] == "slack" and "://" in message["to"]:
+                    message["to"] = SLACK_CHANNEL
+                messages.append(message)
+        os.remove(claimed)
+        if messages:
+            logger.info(f"Resending {len(messages)} notification(s) left over from a previous run")
+        return messages
+
+    def _save_outbox(self, messages):
+        if not messages:
+            return
+        os.makedirs(os.path.dirname(self.outbox) or ".", exist_ok=True)
+        with open(self.outbox, "a", encoding="utf-8") as f:
+            for message in messages:
+                f.write(json.dumps({key: value for key, value in message.items() if key not in ("attempts", "due")}) + "\n")
+        logger.warning(f"Kept {len(messages)} undelivered notification(s) in {self.outbox} for the next run")
+
+    def _drain(self, block_until):
+        while True:
+            timeout = None if block_until is None else block_until - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                block = False
+            else:
+                block = not self._closing.is_set()
+            try:
+                message = self._queue.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                return
+            if message is not _WAKE:
+                with self._lock:
+                    self._waiting.append(message)
+                # Give the rest of a burst a moment to arrive and join this batch
+                if not self._closing.is_set():
+                    block_until = time.monotonic() + self.batch_window
+
+    def _next_wakeup(self):
+        with self._lock:
+            dues = [message["due"] for message in self._waiting]
+        if self._smtp is not None:
+            dues.append(self._smtp_used + SMTP_IDLE_TIMEOUT)
+        return min(dues) if dues else None
+
+    def _run(self):
+        while True:
+            self._drain(self._next_wakeup())
+            if self._smtp is not None and time.monotonic() - self._smtp_used > SMTP_IDLE_TIMEOUT:
+                self._close_smtp()
+            now = time.monotonic()
+            closing = self._closing.is_set()
+            with self._lock:
+                due = [message for message in self._waiting if message["due"] <= now]
+                self._waiting = [message for message in self._waiting if message["due"] > now]
+                # Held here until delivered so an exit mid-send still finds them
+                self._inflight = due
+            groups = {}
+            for message in due:
+                groups.setdefault((message["kind"], message["to"]), []).append(message)
+            for messages in groups.values():
+                self._deliver(merge(messages))
+            with self._lock:
+                self._inflight = []
+            if closing:
+                break
+        self._drain(time.monotonic())
+        with self._lock:
+            leftover, self._waiting = self._waiting, []
+        self._save_outbox(leftover)
+
+    def _deliver(self, message):
+        count = message.get("count", 1)
+        message["attempts"] += 1
+        try:
+            with metrics.span("notify", message["kind"]):
+                if message["kind"] == "email":
+                    self._send_email(message)
+                else:
+                    self._post_slack(message)
+            with self._lock:
+                self.sent += count
+            logger.info(f"Sent {message['kind']} notification ({count} message(s))")
+            return
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None)
+            logger.warning(f"{message['kind'].capitalize()} notification attempt {message['attempts']} failed: {e}")
+        if message["attempts"] >= self.max_attempts:
+            with self._lock:
+                self.failed += count
+            logger.error(f"Gave up on {message['kind']} notification after {message['attempts']} attempts")
+            return
+        delay = retry_after if retry_after is not None else self.backoff * 2 ** (message["attempts"] - 1)
+        message["due"] = time.monotonic() + delay
+        with self._lock:
+            self._waiting.append(message)
+
+    def _smtp_connection(self):
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self._close_smtp()
+        self._smtp = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=HTTP_TIMEOUT)
+        self._smtp.login(self.sender, self.password)
+        return self._smtp
+
+    def _close_smtp(self):
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+    def _send_email(self, message):
+        msg = MIMEText(message["body"])
+        msg["Subject"] = message["subject"]
+        msg["From"] = self.sender
+        msg["To"] = message["to"]
+        try:
+            self._smtp_connection().send_message(msg)
+        except Exception:
+            # The next attempt starts from a fresh connection
+            if self._smtp is not None:
+                self._close_smtp()
+            raise
+        self._smtp_used = time.monotonic()
+
+    def _post_slack(self, message):
+        if self._http is None:
+            self._http = requests.Session()
+        webhook_url = os.getenv(message["to"])
+        if not webhook_url:
+            raise NotifyError(f"{message['to']} is not set")
+        response = self._http.post(webhook_url, json={"text": message["body"]}, timeout=HTTP_TIMEOUT)
+        if response.status_code != 200:
+            raise NotifyError(f"HTTP {response.status_code}: {response.text[:200]}",
+                              retry_after_seconds(response.headers.get("Retry-After")))
+
+    # Stop accepting work, give in-flight delivery up to `timeout` seconds and keep the rest
+    def close(self, timeout=NOTIFY_EXIT_WAIT):
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._closing.set()
+        self._queue.put(_WAKE)
+        thread.join(timeout)
+        if thread.is_alive():
+            with self._lock:
+                leftover = self._inflight + self._waiting
+                self._inflight, self._waiting = [], []
+            while True:
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is not _WAKE:
+                    leftover.append(message)
+            self._save_outbox(leftover)
+            return
+        if self._smtp is not None:
+            self._close_smtp()
+        if self._http is not None:
+            self._http.close()
+
+    def summary(self):
+        with self._lock:
+            pending = len(self._waiting) + self._queue.qsize()
+            return f"Notifications: {self.sent} sent, {self.failed} failed, {pending} pending"
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+# One notifier per process; credentials passed by any caller are kept for the ones that don't
+def get_notifier(sender=None, password=None):
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = Notifier(sender, password)
+        if sender and password:
+            _notifier.sender, _notifier.password = sender, password
+        return _notifier
+
+
+@atexit.register
+def close_notifier():
+    if _notifier is not None:
+        _notifier.close()
@@ -0,0 +1,109 @@
+# utils/parsing.py
+import datetime
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CARD_SELECTOR = "li.jobs-search-results__list-item"
+SAVE_PAGES_DIR = os.getenv("SAVE_RESULT_PAGES_DIR")
+
+
+def _have(module):
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+# Parser backends, fastest first. "selectolax" and "lxml" are optional installs;
+# "html.parser" only needs BeautifulSoup.
+def available_backends():
+    backends = []
+    if _have("selectolax"):
+        backends.append("selectolax")
+    if _have("lxml"):
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+
+def default_backend():
+    configured = os.getenv("HTML_PARSER")
+    if configured:
+        return configured
+    return available_backends()[0]
+
+
+def _split_selector(selector):
+    # "li.jobs-search-results__list-item" -> ("li", "jobs-search-results__list-item")
+    tag, _, css_class = selector.partition(".")
+    return tag, css_class or None
+
+
+# bs4 path: SoupStrainer makes the tree builder keep only the card subtrees
+def _iter_soup_cards(html, parser, card_selector):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    tag, css_class = _split_selector(card_selector)
+    strainer = SoupStrainer(tag, class_=css_class) if css_class else SoupStrainer(tag)
+    soup = BeautifulSoup(html, parser, parse_only=strainer)
+    for card in soup.find_all(tag, class_=css_class) if css_class else soup.find_all(tag):
+        yield card
+
+
+def _soup_field(card, selector, attribute):
+    node = card.select_one(selector)
+    if node is None:
+        return None
+    if attribute:
+        return node.get(attribute)
+    return node.get_text(strip=True)
+
+
+def _iter_selectolax_cards(html, card_selector):
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+
+    for card in HTMLParser(html).css(card_selector):
+        yield card
+
+
+def _selectolax_field(card, selector, attribute):
+    node = card.css_first(selector)
+    if node is None:
+        return None
+    if attribute:
+        return node.attributes.get(attribute)
+    return node.text(strip=True)
+
+
+# Yields one dict per job card. fields maps an output key to (css selector, attribute or None for text).
+def iter_cards(html, fields, backend=None, card_selector=CARD_SELECTOR):
+    backend = backend or default_backend()
+    if backend == "selectolax":
+        cards, field = _iter_selectolax_cards(html, card_selector), _selectolax_field
+    else:
+        cards, field = _iter_soup_cards(html, backend, card_selector), _soup_field
+    for card in cards:
+        yield {key: field(card, selector, attribute) for key, (selector, attribute) in fields.items()}
+
+
+def extract_cards(html, fields, backend=None, card_selector=CARD_SELECTOR):
+    return list(iter_cards(html, fields, backend, card_selector))
+
+
+# Keep a copy of a results page (set SAVE_RESULT_PAGES_DIR) for the parser benchmark
+def save_page(html, source):
+    if not SAVE_PAGES_DIR or not html:
+        return None
+    os.makedirs(SAVE_PAGES_DIR, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = os.path.join(SAVE_PAGES_DIR, f"{source}-{stamp}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    logger.debug(f"Saved results page to {path}")
+    return path
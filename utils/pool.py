@@ -0,0 +1,156 @@
+# utils/pool.py
+import logging
+import queue
+import threading
+import time
+
+from utils.browser import driver_alive
+from utils.metrics import metrics
+from utils.ratelimit import domain_of
+
+logger = logging.getLogger(__name__)
+
+
+def _url(job):
+    return job.get("url") if isinstance(job, dict) else getattr(job, "url", None)
+
+
+def _quit(driver):
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+# Runs apply_fn(driver, job) over a shared job queue with one WebDriver per worker.
+# A worker whose browser crashes restarts it and retries the job without affecting the others.
+# With a SessionPool, drivers are borrowed from it and handed back on close instead of quit.
+# on_result(job, result) gets every job apply_fn finished. A job that never finished (its browser
+# kept crashing, or the run stopped first) goes to on_crash(job) when given, so callers can leave
+# it for a retry; without on_crash it reaches on_result with a None result.
+class ApplyPool:
+    def __init__(self, driver_factory, apply_fn, workers=3, budget=None, on_result=None, retries=1, max_restarts=3,
+                 sessions=None, on_crash=None):
+        self.sessions = sessions
+        self.driver_factory = sessions.acquire if sessions else driver_factory
+        self.apply_fn = apply_fn
+        self.workers = max(1, workers)
+        self.budget = budget
+        self.on_result = on_result
+        self.on_crash = on_crash
+        self.retries = retries
+        self.max_restarts = max_restarts
+        self._drivers = []
+
+    # Worker drivers are created on first use and kept across run() calls until close()
+    def close(self):
+        for driver in self._drivers:
+            if driver is not None and self.sessions:
+                self.sessions.release(driver)
+            else:
+                _quit(driver)
+        self._drivers = []
+
+    def _drop(self, driver):
+        if driver is not None and self.sessions:
+            self.sessions.discard(driver)
+        else:
+            _quit(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def run(self, jobs, limit=None):
+        self._queue = queue.Queue()
+        for job in jobs:
+            self._queue.put(job)
+        self._limit = limit
+        self._successes = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self.results = []
+
+        while len(self._drivers) < self.workers:
+            self._drivers.append(None)
+        threads = [
+            threading.Thread(target=self._worker, args=(i,), name=f"apply-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logger.info(f"Apply pool finished: {self._successes} succeeded out of {len(self.results)} attempted")
+        return self.results
+
+    def _reserve(self):
+        with self._cond:
+            while self._limit is not None and self._successes + self._in_flight >= self._limit:
+                if self._in_flight == 0:
+                    return False
+                self._cond.wait()
+            self._in_flight += 1
+            return True
+
+    def _finish(self, job, result, finished=True):
+        with self._cond:
+            self._in_flight -= 1
+            if result:
+                self._successes += 1
+            self.results.append((job, result))
+            self._cond.notify_all()
+        try:
+            if not finished and not result and self.on_crash:
+                self.on_crash(job)
+            elif self.on_result:
+                self.on_result(job, result)
+        except Exception as e:
+            logger.error(f"Result callback failed for {_url(job)}: {e}")
+
+    def _worker(self, index):
+        restarts = 0
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not self._reserve():
+                self._stop.set()
+                break
+
+            result = None
+            finished = False
+            for _ in range(self.retries + 1):
+                try:
+                    if self._drivers[index] is None:
+                        self._drivers[index] = self.driver_factory()
+                    if self.budget and not self.budget.acquire(self._stop):
+                        break
+                    started = time.monotonic()
+                    try:
+                        result = self.apply_fn(self._drivers[index], job)
+                    finally:
+                        metrics.record("apply", time.monotonic() - started, domain_of(_url(job) or ""), ok=bool(result))
+                    crashed = not driver_alive(self._drivers[index])
+                except Exception as e:
+                    logger.warning(f"Worker {index} crashed on {_url(job)}: {e}")
+                    crashed = True
+                if not crashed:
+                    finished = True
+                    break
+                self._drop(self._drivers[index])
+                self._drivers[index] = None
+                restarts += 1
+                if restarts > self.max_restarts:
+                    break
+            self._finish(job, result, finished)
+
+            if restarts > self.max_restarts:
+                logger.error(f"Worker {index} exceeded {self.max_restarts} browser restarts, stopping it")
+                break
@@ -0,0 +1,83 @@
+# utils/profiles.py
+import itertools
+import json
+import os
+from dataclasses import dataclass
+
+PROFILES_FILE = os.getenv("PROFILES_FILE", "profiles.json")
+# The bots' original slot: Mondays at 09:00, in local time unless SCHEDULE_TIMEZONE names a zone
+DEFAULT_SCHEDULE = "0 9 * * 1"
+DEFAULT_TIMEZONE = os.getenv("SCHEDULE_TIMEZONE") or None
+
+
+# One saved search: what to look for, where, on which boards (None = every registered source)
+# and when to run it. schedule is a five-field cron expression read in `timezone` (None = local
+# time); each run starts up to `jitter` seconds after its slot.
+@dataclass
+class Profile:
+    name: str
+    query: str
+    location: str = ""
+    sources: tuple = None
+    schedule: str = DEFAULT_SCHEDULE
+    timezone: str = DEFAULT_TIMEZONE
+    jitter: float = 0.0
+
+    # Whether the profile searches the named board; names match in any case, as in scrapers.source_name
+    def uses(self, source):
+        return not self.sources or any(name.lower() == source.lower() for name in self.sources)
+
+
+def default_profile():
+    return Profile(
+        "default",
+        os.getenv("JOB_SEARCH_QUERY", "Software Engineer"),
+        os.getenv("JOB_SEARCH_LOCATION", "Remote"),
+    )
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+# Registered source names for a profile's "sources"; any case is accepted, and an unknown name
+# fails here rather than at the profile's first run
+def _source_names(sources, path):
+    # scrapers pulls in the HTTP client; only profiles that name sources need it
+    from scrapers import source_name
+
+    try:
+        return tuple(source_name(name) for name in _as_list(sources))
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+# Profiles from a JSON list. An entry may give "query" and "location" as lists, in which case it
+# expands to one profile per query x location pair, named "<name>-1", "<name>-2", ...
+# Without the file there is a single profile from JOB_SEARCH_QUERY / JOB_SEARCH_LOCATION.
+def load_profiles(path=PROFILES_FILE):
+    if not os.path.exists(path):
+        return [default_profile()]
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    profiles = []
+    for entry in entries:
+        if not entry.get("name") or not entry.get("query"):
+            raise ValueError(f"Profile entries in {path} need a name and a query: {entry}")
+        sources = _source_names(entry["sources"], path) if entry.get("sources") else None
+        pairs = list(itertools.product(_as_list(entry["query"]), _as_list(entry.get("location", ""))))
+        for index, (query, location) in enumerate(pairs, start=1):
+            profiles.append(Profile(
+                entry["name"] if len(pairs) == 1 else f"{entry['name']}-{index}",
+                query,
+                location,
+                sources=sources,
+                schedule=entry.get("schedule", DEFAULT_SCHEDULE),
+                timezone=entry.get("timezone", DEFAULT_TIMEZONE),
+                jitter=float(entry.get("jitter", 0)),
+            ))
+    names = [profile.name for profile in profiles]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate profile names in {path}: {', '.join(duplicates)}")
+    return profiles
@@ -0,0 +1,173 @@
+# utils/ratelimit.py
+import email.utils
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Per-domain request rates (requests per minute). Each domain starts at DOMAIN_RATE_PER_MINUTE,
+# or its entry in DOMAIN_RATES ("linkedin.com=20,indeed.com=10"), and adapts between the bounds.
+DOMAIN_RATE_PER_MINUTE = float(os.getenv("DOMAIN_RATE_PER_MINUTE", "30"))
+DOMAIN_RATE_MIN = float(os.getenv("DOMAIN_RATE_MIN", "2"))
+DOMAIN_RATE_MAX = float(os.getenv("DOMAIN_RATE_MAX", "120"))
+DOMAIN_RATES = os.getenv("DOMAIN_RATES", "")
+# Responses slower than this (seconds) count as the site straining
+DOMAIN_TARGET_LATENCY = float(os.getenv("DOMAIN_TARGET_LATENCY", "3"))
+# Pause after a 429 or challenge page when the site doesn't send Retry-After
+DOMAIN_COOLDOWN = float(os.getenv("DOMAIN_COOLDOWN", "60"))
+
+THROTTLE_STATUSES = {429, 503, 999}
+CHALLENGE_MARKERS = ("/checkpoint/challenge", "/authwall", "/cdn-cgi/challenge", "captcha", "challenge-platform")
+
+
+# Token bucket shared by every worker; acquire() blocks until an action is allowed
+class RateBudget:
+    def __init__(self, per_minute, burst=1):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, stop_event=None):
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+# Token bucket for one site whose rate follows what the site tells us. Every fast, clean
+# response adds `step` requests/minute; a response slower than target_latency trims the rate
+# by 10%; a throttle status (429, 503, LinkedIn's 999) or a challenge page halves it and
+# pauses the domain for Retry-After or `cooldown` seconds. The rate stays within
+# [min_per_minute, max_per_minute].
+class AdaptiveLimiter(RateBudget):
+    def __init__(self, domain, per_minute=DOMAIN_RATE_PER_MINUTE, min_per_minute=DOMAIN_RATE_MIN,
+                 max_per_minute=DOMAIN_RATE_MAX, burst=2, target_latency=DOMAIN_TARGET_LATENCY,
+                 cooldown=DOMAIN_COOLDOWN, step=1.0):
+        super().__init__(min(max_per_minute, max(min_per_minute, per_minute)), burst)
+        self.domain = domain
+        self.min_rate = min_per_minute / 60.0
+        self.max_rate = max_per_minute / 60.0
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.step = step / 60.0
+        self._paused_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.challenges = 0
+
+    @property
+    def per_minute(self):
+        return self.rate * 60
+
+    def try_acquire(self):
+        with self._lock:
+            paused = self._paused_until - time.monotonic()
+        if paused > 0:
+            return paused
+        return super().try_acquire()
+
+    def _set_rate(self, rate):
+        # Tokens earned so far are banked at the old rate before it changes
+        self._refill()
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def record(self, latency=None, status=None, challenged=False, retry_after=None):
+        with self._lock:
+            self.requests += 1
+            if challenged or status in THROTTLE_STATUSES:
+                if challenged:
+                    self.challenges += 1
+                else:
+                    self.throttled += 1
+                self._set_rate(self.rate / 2)
+                pause = retry_after if retry_after is not None else self.cooldown
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                self._tokens = 0.0
+                reason = "challenge page" if challenged else f"HTTP {status}"
+                logger.warning(f"{self.domain}: {reason}, pausing {pause:.0f}s and slowing to {self.per_minute:.1f}/min")
+            elif latency is not None and latency > self.target_latency:
+                self._set_rate(self.rate * 0.9)
+            else:
+                self._set_rate(self.rate + self.step)
+
+    def summary(self):
+        return (
+            f"{self.domain}: {self.requests} request(s) at {self.per_minute:.1f}/min, "
+            f"{self.throttled} throttled, {self.challenges} challenge(s)"
+        )
+
+
+def domain_of(url):
+    host = (urlsplit(url).hostname or url).lower()
+    return ".".join(host.split(".")[-2:])
+
+
+def is_challenge(url):
+    return bool(url) and any(marker in url for marker in CHALLENGE_MARKERS)
+
+
+# Retry-After is either seconds or an HTTP date
+def retry_after_seconds(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _configured_rates():
+    rates = {}
+    for entry in DOMAIN_RATES.split(","):
+        domain, sep, rate = entry.partition("=")
+        if sep:
+            rates[domain.strip().lower()] = float(rate)
+    return rates
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+# The one limiter for a URL's site, shared by browser navigation and HTTP fetches in this process
+def get_limiter(url):
+    domain = domain_of(url)
+    with _limiters_lock:
+        limiter = _limiters.get(domain)
+        if limiter is None:
+            rate = _configured_rates().get(domain, DOMAIN_RATE_PER_MINUTE)
+            limiter = _limiters[domain] = AdaptiveLimiter(domain, per_minute=rate)
+        return limiter
+
+
+def summary():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return "; ".join(limiter.summary() for limiter in limiters if limiter.requests) or "No site requests made"
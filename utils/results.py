@@ -0,0 +1,132 @@
+# utils/results.py
+import atexit
+import csv
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RESULTS_BATCH_SIZE = int(os.getenv("RESULTS_BATCH_SIZE", "20"))
+RESULTS_FLUSH_SECONDS = float(os.getenv("RESULTS_FLUSH_SECONDS", "5"))
+
+
+# Append-only CSV results file. One file handle and csv writer stay open for the sink's
+# lifetime; rows are buffered and written in batches (every batch_size rows or flush_seconds),
+# and checkpoint() also fsyncs. Large text such as cover letters goes through attach(), which
+# stores it once in a content-addressed file next to the CSV and returns the relative path to
+# put in the row instead. Rows written before a crash are never rewritten.
+class ResultsSink:
+    def __init__(self, path, header, batch_size=RESULTS_BATCH_SIZE, flush_seconds=RESULTS_FLUSH_SECONDS):
+        self.path = path
+        self.header = list(header)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.blob_dir = os.path.splitext(path)[0] + "_files"
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self.rows_written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._writer.writerow(self.header)
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    # Row as a list in header order, a dict keyed by header names, or a utils.models.Job
+    def write(self, row):
+        if isinstance(row, dict):
+            row = [row.get(column, "") for column in self.header]
+        elif hasattr(row, "to_row"):
+            row = row.to_row(self.header)
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush()
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def attach(self, text, suffix=".txt"):
+        if not text:
+            return ""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        path = os.path.join(self.blob_dir, digest[:2], digest + suffix)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        return os.path.relpath(path, os.path.dirname(self.path) or ".")
+
+    def _flush(self, sync=False):
+        started = time.monotonic()
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+        metrics.record("write", self._last_flush - started, os.path.basename(self.path))
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+
+    # Durable point: everything written so far is on disk
+    def checkpoint(self):
+        with self._lock:
+            if not self._file.closed:
+                self._flush(sync=True)
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush(sync=True)
+            self._file.close()
+        logger.debug(f"Closed results file {self.path} after {self.rows_written} row(s)")
+
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+# Shared sink per file, so every part of a process appends through one writer
+def get_results_sink(path, header):
+    with _sinks_lock:
+        sink = _sinks.get(path)
+        if sink is None or sink.closed:
+            sink = _sinks[path] = ResultsSink(path, header)
+        return sink
+
+
+@atexit.register
+def close_all():
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as e:
+            logger.warning(f"Could not close results file {sink.path}: {e}")
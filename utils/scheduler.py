@@ -0,0 +1,264 @@
+# utils/scheduler.py
+import datetime
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo
+
+from utils.metrics import metrics
+from utils.profiles import load_profiles
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LOCK_DIR = os.getenv("SCHEDULER_LOCK_DIR", os.path.join("data", "locks"))
+# A lock older than this is treated as left behind by a crashed run, whatever its pid says
+SCHEDULER_LOCK_TTL = float(os.getenv("SCHEDULER_LOCK_TTL", str(6 * 3600)))
+# Profiles that may run at the same time in one scheduler process
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "1"))
+# Longest single sleep, so a suspended machine or a clock change is noticed within this many seconds
+SCHEDULER_MAX_SLEEP = 900
+
+# minute, hour, day of month, month, day of week (0 or 7 = Sunday)
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+# Names accepted, in any case, in the month and day-of-week fields
+CRON_NAMES = {
+    3: {name: number for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)},
+    4: {name: number for number, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))},
+}
+
+
+def _field_value(value, names, text):
+    value = value.strip().lower()
+    if value in names:
+        return names[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Cron field {text!r} has an unknown value {value!r}") from None
+
+
+def _parse_field(text, low, high, names=None):
+    names = names or {}
+    values = set()
+    for part in text.split(","):
+        spec, slash, step = part.partition("/")
+        step = _field_value(step, {}, text) if slash else 1
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (_field_value(value, names, text) for value in spec.split("-", 1))
+        else:
+            start = _field_value(spec, names, text)
+            end = high if slash else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Cron field {text!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+# Five-field cron expression ("30 8 * * 1-5" or "30 8 * * MON-FRI" = weekdays at 08:30). As in
+# cron, when both day of month and day of week are restricted a day matching either one counts.
+class CronSchedule:
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs five fields: {expression!r}")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(field, low, high, CRON_NAMES.get(index))
+            for index, (field, (low, high)) in enumerate(zip(fields, CRON_FIELDS))
+        )
+        self.expression = expression
+        self.minutes = minutes
+        self.hours = hours
+        self.days = set(days)
+        self.months = set(months)
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, date):
+        day_ok = date.day in self.days
+        weekday_ok = (date.weekday() + 1) % 7 in self.weekdays
+        if not self.any_day and not self.any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    # First matching minute after `after`; the result is in after's timezone, or naive local
+    # time when `after` is naive
+    def next_after(self, after):
+        start = after.replace(tzinfo=None, second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        day = start.date()
+        # Eight years covers a Feb 29 that also has to fall on a given weekday
+        for _ in range(366 * 8):
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        slot = datetime.datetime.combine(day, datetime.time(hour, minute))
+                        if slot >= start:
+                            return slot.replace(tzinfo=after.tzinfo)
+            day += datetime.timedelta(days=1)
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+def _pid_alive(pid):
+    # Signal 0 only probes on POSIX; on Windows the lock's age decides instead
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Lockfile that keeps one run of a profile at a time across every process on the machine. A
+# lock whose process has exited, or that is older than `ttl`, is taken over.
+class ProfileLock:
+    def __init__(self, name, lock_dir=SCHEDULER_LOCK_DIR, ttl=SCHEDULER_LOCK_TTL):
+        self.path = os.path.join(lock_dir, re.sub(r"[^\w.-]+", "_", name) + ".lock")
+        self.ttl = ttl
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def _stale(self):
+        try:
+            age = time.time() - os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                pid = json.load(f).get("pid")
+        except FileNotFoundError:
+            return True
+        except (OSError, ValueError):
+            # Half-written by a process that died while taking it
+            return age > self.ttl
+        return age > self.ttl or (pid is not None and not _pid_alive(pid))
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        for attempt in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if attempt == 0 and self._stale():
+                    logger.info(f"Removing stale lock {self.path}")
+                    try:
+                        os.remove(self.path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                return False
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"pid": os.getpid(), "started": time.time()}, f)
+            return True
+        return False
+
+    def release(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+# Runs each profile on its cron schedule by sleeping until the next due slot; there is no
+# polling. run(profile) does the work. A profile still running when its next slot comes, here
+# or in another process, skips that slot. on_error(profile, exc) is called when a run raises.
+class Scheduler:
+    def __init__(self, profiles, run, on_error=None, workers=SCHEDULER_WORKERS):
+        self.profiles = list(profiles)
+        self.run = run
+        self.on_error = on_error
+        # Bad expressions or timezones fail at startup rather than at the first slot
+        self._crons = {profile.name: CronSchedule(profile.schedule) for profile in self.profiles}
+        # No timezone means the machine's local time
+        self._zones = {
+            profile.name: ZoneInfo(profile.timezone) if profile.timezone else None for profile in self.profiles
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="profile")
+        self._running = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def next_due(self, profile, after):
+        zone = self._zones[profile.name]
+        slot = self._crons[profile.name].next_after(datetime.datetime.fromtimestamp(after, zone))
+        return slot.timestamp() + random.uniform(0, profile.jitter)
+
+    def _log_next(self, profile, due):
+        when = datetime.datetime.fromtimestamp(due, self._zones[profile.name])
+        logger.info(f"Profile {profile.name}: next run {when:%a %Y-%m-%d %H:%M:%S} {profile.timezone or 'local time'}")
+
+    def run_forever(self):
+        now = time.time()
+        due = {}
+        for profile in self.profiles:
+            due[profile.name] = self.next_due(profile, now)
+            self._log_next(profile, due[profile.name])
+        try:
+            while not self._stop.is_set():
+                now = time.time()
+                for profile in self.profiles:
+                    if due[profile.name] <= now:
+                        self.submit(profile)
+                        due[profile.name] = self.next_due(profile, now)
+                        self._log_next(profile, due[profile.name])
+                wait = min(due.values()) - time.time()
+                self._stop.wait(min(max(0.0, wait), SCHEDULER_MAX_SLEEP))
+        except KeyboardInterrupt:
+            logger.info("Scheduler interrupted")
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def submit(self, profile):
+        with self._lock:
+            if profile.name in self._running:
+                logger.warning(f"Profile {profile.name} is still running, skipping this slot")
+                return None
+            self._running.add(profile.name)
+        return self._executor.submit(self._run_profile, profile)
+
+    def _run_profile(self, profile):
+        lock = ProfileLock(profile.name)
+        try:
+            if not lock.acquire():
+                logger.warning(f"Profile {profile.name} is running in another process, skipping this slot")
+                return
+            started = time.monotonic()
+            logger.info(f"Running profile {profile.name}: {profile.query!r} in {profile.location or 'any location'}")
+            try:
+                self.run(profile)
+                logger.info(f"Profile {profile.name} finished in {time.monotonic() - started:.0f}s")
+            except Exception as e:
+                logger.error(f"Profile {profile.name} failed: {e}")
+                if self.on_error is not None:
+                    self.on_error(profile, e)
+            finally:
+                lock.release()
+                # The daemon never exits, so the metrics file is refreshed after every run
+                try:
+                    metrics.export()
+                except OSError as e:
+                    logger.warning(f"Could not write metrics: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(profile.name)
+
+    def stop(self):
+        self._stop.set()
+
+
+# Daemon entry point for the bots' __main__ blocks
+def run_scheduler(run, profiles=None, on_error=None):
+    profiles = profiles if profiles is not None else load_profiles()
+    logger.info(f"Scheduling {len(profiles)} profile(s)")
+    Scheduler(profiles, run, on_error=on_error).run_forever()
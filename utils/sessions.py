@@ -0,0 +1,229 @@
+# utils/sessions.py
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import waits
+from utils.browser import LINKEDIN_HOME, driver_alive, new_chrome
+from utils.cookies import SESSION_DIR, cookie_file, saved_cookies
+from utils.metrics import metrics
+from utils.scheduler import ProfileLock
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_INTERVAL = float(os.getenv("SESSION_CHECK_INTERVAL", "600"))
+
+
+def linkedin_logged_in(driver):
+    waits.open_page(driver, f"{LINKEDIN_HOME}/feed/")
+    url = driver.current_url
+    return "/feed" in url and "/login" not in url and "authwall" not in url
+
+
+# Keeps warm, logged-in browsers for one site. Each browser gets its own Chrome profile
+# directory, and the auth cookies are saved to disk so a new browser or a later run
+# can restore them. The login callback only runs when the health check fails.
+# Profile directories are claimed with a lockfile, since Chrome refuses one that another
+# process (say a second scheduler running a different profile) already has open.
+class SessionPool:
+    def __init__(self, name, login, health_check=linkedin_logged_in, home_url=LINKEDIN_HOME,
+                 driver_factory=None, headless=False, fast=False, arguments=(), size=1):
+        self.name = name
+        self.login = login
+        self.health_check = health_check
+        self.home_url = home_url
+        self.driver_factory = driver_factory or (
+            lambda profile_dir: new_chrome(headless=headless, fast=fast, profile_dir=profile_dir, arguments=arguments)
+        )
+        self.size = size
+        self.root = os.path.join(SESSION_DIR, name)
+        self.cookie_file = cookie_file(name)
+        self._lock = threading.Condition()
+        self._idle = []
+        self._slots = {}
+        self._checked = {}
+        self._locks = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    # Lowest slot not used here whose profile directory no other process holds
+    def _free_slot(self):
+        used = set(self._slots.values())
+        slot = 0
+        while slot in used or not self._claim(slot):
+            slot += 1
+        return slot
+
+    def _claim(self, slot):
+        # Held for as long as the browser runs, so only a dead owner's lock is taken over
+        lock = ProfileLock(f"profile-{slot}", lock_dir=self.root, ttl=float("inf"))
+        if not lock.acquire():
+            return False
+        self._locks[slot] = lock
+        return True
+
+    def _unclaim(self, slot):
+        lock = self._locks.pop(slot, None)
+        if lock is not None:
+            lock.release()
+
+    def save_cookies(self, driver):
+        try:
+            cookies = driver.get_cookies()
+        except Exception as e:
+            logger.warning(f"Could not read cookies for {self.name}: {e}")
+            return
+        tmp = self.cookie_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+        os.replace(tmp, self.cookie_file)
+        logger.info(f"Saved {len(cookies)} {self.name} cookie(s)")
+
+    def restore_cookies(self, driver):
+        cookies = saved_cookies(self.name)
+        if not cookies:
+            return 0
+        waits.open_page(driver, self.home_url)
+        restored = 0
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+                restored += 1
+            except Exception as e:
+                logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+        return restored
+
+    def _healthy(self, driver, force=False):
+        last = self._checked.get(id(driver))
+        if not force and last is not None and time.monotonic() - last < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            ok = self.health_check(driver)
+        except Exception as e:
+            logger.warning(f"{self.name} health check failed: {e}")
+            ok = False
+        if ok:
+            self._checked[id(driver)] = time.monotonic()
+        return ok
+
+    def _start(self, slot):
+        profile_dir = os.path.abspath(os.path.join(self.root, f"profile-{slot}"))
+        driver = self.driver_factory(profile_dir)
+        try:
+            if not self._healthy(driver, force=True):
+                if self.restore_cookies(driver) and self._healthy(driver, force=True):
+                    logger.info(f"Restored {self.name} session from saved cookies")
+                else:
+                    self._authenticate(driver)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def _authenticate(self, driver):
+        logger.info(f"Logging in to {self.name}")
+        with metrics.span("login", self.name):
+            if self.login(driver) is False:
+                raise RuntimeError(f"{self.name} login failed")
+        self._checked[id(driver)] = time.monotonic()
+        self.save_cookies(driver)
+
+    def acquire(self):
+        with self._lock:
+            while not self._idle and len(self._slots) >= self.size:
+                self._lock.wait()
+            if self._idle:
+                driver = self._idle.pop()
+            else:
+                driver = None
+                slot = self._free_slot()
+                pending = ("starting", slot)
+                self._slots[pending] = slot
+
+        if driver is None:
+            try:
+                driver = self._start(slot)
+            except Exception:
+                with self._lock:
+                    del self._slots[pending]
+                    self._unclaim(slot)
+                    self._lock.notify()
+                raise
+            with self._lock:
+                del self._slots[pending]
+                self._slots[id(driver)] = slot
+            return driver
+
+        if not driver_alive(driver):
+            self.discard(driver)
+            return self.acquire()
+        if not self._healthy(driver):
+            try:
+                self._authenticate(driver)
+            except Exception:
+                # Free its slot, or acquire() would wait for it forever once the pool is full
+                self.discard(driver)
+                raise
+        return driver
+
+    def release(self, driver):
+        if not driver_alive(driver):
+            self.discard(driver)
+            return
+        with self._lock:
+            self._idle.append(driver)
+            self._lock.notify()
+
+    def discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            slot = self._slots.pop(id(driver), None)
+            if slot is not None:
+                self._unclaim(slot)
+            self._checked.pop(id(driver), None)
+            if driver in self._idle:
+                self._idle.remove(driver)
+            self._lock.notify()
+
+    @contextmanager
+    def session(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        if idle and driver_alive(idle[0]):
+            self.save_cookies(idle[0])
+        for driver in idle:
+            self.discard(driver)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# One pool per site per process, so a scheduler that keeps the process alive reuses warm browsers
+def get_session_pool(name, login, **kwargs):
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = SessionPool(name, login, **kwargs)
+        elif kwargs.get("size", 1) > pool.size:
+            pool.size = kwargs["size"]
+        return pool
+
+
+@atexit.register
+def close_all():
+    for pool in list(_pools.values()):
+        pool.close()
@@ -0,0 +1,511 @@
+# utils/storage.py
+import csv
+import datetime
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.getenv("JOB_STORE_PATH", os.path.join("data", "jobs.db"))
+
+# Trackers that were used before the store existed; see JobStore.migrate_legacy
+LEGACY_JSON = os.path.join("data", "job_listings.json")
+LEGACY_SUBMITTED_CSV = "submitted_jobs.csv"
+LEGACY_APPLIED_CSV = "applied_jobs.csv"
+
+JOB_FIELDS = ["id", "url", "title", "company", "location", "source", "status", "notes", "cover_letter_path"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    source TEXT,
+    status TEXT NOT NULL DEFAULT 'new',
+    notes TEXT,
+    cover_letter_path TEXT,
+    extra TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_url ON jobs(url);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS dedupe_keys (
+    id TEXT PRIMARY KEY,
+    url TEXT,
+    fingerprint TEXT,
+    simhash TEXT
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO jobs (id, url, title, company, location, source, status, notes, cover_letter_path, extra, created_at, updated_at)
+VALUES (:id, :url, :title, :company, :location, :source, COALESCE(:status, 'new'), :notes, :cover_letter_path, :extra, :now, :now)
+ON CONFLICT(id) DO UPDATE SET
+    url = COALESCE(excluded.url, jobs.url),
+    title = COALESCE(excluded.title, jobs.title),
+    company = COALESCE(excluded.company, jobs.company),
+    location = COALESCE(excluded.location, jobs.location),
+    source = COALESCE(excluded.source, jobs.source),
+    status = COALESCE(:status, jobs.status),
+    notes = COALESCE(excluded.notes, jobs.notes),
+    cover_letter_path = COALESCE(excluded.cover_letter_path, jobs.cover_letter_path),
+    extra = COALESCE(excluded.extra, jobs.extra),
+    updated_at = excluded.updated_at
+"""
+
+# The legacy trackers are re-read whenever they change, so their rows must never move a job
+# back: a status is only taken over while the job is still new, or when the row says applied
+LEGACY_UPSERT_SQL = UPSERT_SQL.replace(
+    "status = COALESCE(:status, jobs.status)",
+    "status = CASE WHEN jobs.status = 'new' OR lower(:status) = 'applied' "
+    "THEN COALESCE(:status, jobs.status) ELSE jobs.status END",
+)
+
+# Job ids hash the canonical URL; stores written when they hashed the raw URL are re-keyed on open
+ID_SCHEME = "canonical-url"
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"refid", "trackingid", "trk", "trkinfo", "lipi", "originalsubdomain", "ref", "source", "src", "position", "pagenum", "ebp", "eid"}
+TRACKING_PREFIXES = ("utm_", "mc_", "fbclid", "gclid")
+_LINKEDIN_JOB_ID = re.compile(r"/jobs/view/(?:[^/]*?-)?(\d+)")
+
+# Fields the dedupe keys are computed from (description is kept in the extra column)
+DEDUPE_FIELDS = ("url", "title", "company", "location")
+
+# SQLite caps the number of bound parameters per statement
+CHUNK_SIZE = 500
+
+# Statuses (compared lowercased) that mean we already sent an application
+APPLIED_STATUSES = {"applied"}
+
+
+def load_json(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+# Jobs may be dicts or utils.models.Job records
+def as_record(job):
+    return job if isinstance(job, dict) else job.to_dict()
+
+
+# The same posting under one key: no tracking parameters, no "www.", and LinkedIn's
+# /jobs/view/123, /jobs/view/python-dev-at-acme-123 and ?currentJobId=123 all as one URL
+def canonical_url(url):
+    url = clean_value(url)
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = dict(parse_qsl(parts.query))
+    if host.endswith("linkedin.com"):
+        match = _LINKEDIN_JOB_ID.search(path)
+        job = match.group(1) if match else query.get("currentJobId")
+        if job:
+            return f"linkedin.com/jobs/view/{job}"
+    kept = sorted(
+        (key, value) for key, value in query.items()
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(("", host, path, urlencode(kept), "")).lstrip("/")
+
+
+def job_id(job):
+    job = as_record(job)
+    if job.get("id"):
+        return str(job["id"])
+    key = canonical_url(job.get("url"))
+    if not key:
+        key = "|".join((job.get("source") or "", job.get("company") or "", job.get("title") or ""))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _status_rank(status):
+    status = (status or "new").lower()
+    if status in APPLIED_STATUSES:
+        return 2
+    return 0 if status == "new" else 1
+
+
+# Field value as stored: None for missing values, including the scrapers' "N/A" placeholder
+def clean_value(value):
+    if value is None or value == "N/A":
+        return None
+    return str(value)
+
+
+def _row_params(job, status, now):
+    job = as_record(job)
+    extra = {k: v for k, v in job.items() if k not in JOB_FIELDS}
+    return {
+        "id": job_id(job),
+        "url": clean_value(job.get("url")),
+        "title": clean_value(job.get("title")),
+        "company": clean_value(job.get("company")),
+        "location": clean_value(job.get("location")),
+        "source": clean_value(job.get("source")),
+        "status": status or job.get("status"),
+        "notes": job.get("notes"),
+        "cover_letter_path": job.get("cover_letter_path"),
+        "extra": json.dumps(extra, default=str) if extra else None,
+        "now": now,
+    }
+
+
+def _with_extra(row):
+    job = dict(row)
+    extra = json.loads(job.pop("extra") or "{}")
+    for key, value in extra.items():
+        job.setdefault(key, value)
+    return job
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class JobStore:
+    def __init__(self, path=DEFAULT_DB_PATH, migrate=True):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._statuses = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._rekey()
+        if migrate:
+            self.migrate_legacy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Rows keyed by an older id scheme get the current job_id once. Rows that turn out to be the
+    # same posting are merged into one, keeping the furthest status (applied over seen over new).
+    def _rekey(self):
+        if self.get_meta("id_scheme") == ID_SCHEME:
+            return
+        with self._lock, self._conn:
+            rows = self._conn.execute("SELECT id, url, status FROM jobs WHERE url IS NOT NULL").fetchall()
+            moved = 0
+            for row in rows:
+                new_id = job_id({"url": row["url"]})
+                if new_id == row["id"]:
+                    continue
+                target = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (new_id,)).fetchone()
+                if target is None:
+                    self._conn.execute("UPDATE jobs SET id = ? WHERE id = ?", (new_id, row["id"]))
+                else:
+                    if _status_rank(row["status"]) > _status_rank(target["status"]):
+                        self._conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (row["status"], new_id))
+                    self._conn.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+                self._conn.execute("DELETE FROM dedupe_keys WHERE id IN (?, ?)", (row["id"], new_id))
+                moved += 1
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('id_scheme', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (ID_SCHEME,),
+            )
+        if moved:
+            logger.info(f"Re-keyed {moved} job(s) by canonical URL")
+
+    def _existing_ids(self, ids):
+        if self._statuses is not None:
+            return {id_ for id_ in ids if id_ in self._statuses}
+        found = set()
+        for chunk in _chunks(ids):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(f"SELECT id FROM jobs WHERE id IN ({placeholders})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    # Existing ids the upsert would give a different url, title, company, location or
+    # description. Status-only updates and repeats of what is stored are left out, so they keep
+    # their dedupe keys.
+    def _changed_ids(self, params, existing):
+        candidates = [
+            p for p in params
+            if p["id"] in existing and (any(p[field] is not None for field in DEDUPE_FIELDS) or p["extra"])
+        ]
+        stored = {}
+        for chunk in _chunks([p["id"] for p in candidates]):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT id, url, title, company, location, extra FROM jobs WHERE id IN ({placeholders})", chunk
+            )
+            stored.update((row["id"], row) for row in rows)
+        changed = set()
+        for p in candidates:
+            row = stored.get(p["id"])
+            if row is None:
+                continue
+            if any(p[field] is not None and p[field] != row[field] for field in DEDUPE_FIELDS):
+                changed.add(p["id"])
+                continue
+            description = json.loads(p["extra"]).get("description") if p["extra"] else None
+            if description and description != json.loads(row["extra"] or "{}").get("description"):
+                changed.add(p["id"])
+        return changed
+
+    # Insert new jobs and merge non-empty fields into existing ones; returns the new job ids
+    def upsert_many(self, jobs, status=None, legacy=False):
+        now = datetime.datetime.now().isoformat()
+        params = [_row_params(job, status, now) for job in jobs]
+        if not params:
+            return []
+        with self._lock, self._conn:
+            existing = self._existing_ids([p["id"] for p in params])
+            changed = self._changed_ids(params, existing)
+            self._conn.executemany(LEGACY_UPSERT_SQL if legacy else UPSERT_SQL, params)
+            # Jobs whose identifying fields changed get their dedupe keys recomputed on the next dedupe pass
+            for chunk in _chunks(list(changed)):
+                placeholders = ",".join("?" * len(chunk))
+                self._conn.execute(f"DELETE FROM dedupe_keys WHERE id IN ({placeholders})", chunk)
+            if legacy:
+                # Whether a status was taken over is decided in SQL; reload the index on next use
+                self._statuses = None
+            elif self._statuses is not None:
+                for p in params:
+                    if p["status"]:
+                        self._statuses[p["id"]] = str(p["status"]).lower()
+                    else:
+                        self._statuses.setdefault(p["id"], "new")
+        new_ids = []
+        for p in params:
+            if p["id"] not in existing:
+                existing.add(p["id"])
+                new_ids.append(p["id"])
+        return new_ids
+
+    def upsert(self, job, status=None):
+        return bool(self.upsert_many([job], status=status))
+
+    def set_status(self, job, status, **fields):
+        return self.upsert(dict(as_record(job), **fields), status=status)
+
+    # In-memory id -> status index, loaded with one query on first use and kept in step by
+    # upsert_many, so "have we seen/applied to this?" never touches the database
+    def _index(self):
+        if self._statuses is None:
+            rows = self._conn.execute("SELECT id, status FROM jobs")
+            self._statuses = {id_: (status or "").lower() for id_, status in rows}
+        return self._statuses
+
+    def has_seen(self, job):
+        with self._lock:
+            return job_id(job) in self._index()
+
+    def has_applied(self, job):
+        with self._lock:
+            return self._index().get(job_id(job)) in APPLIED_STATUSES
+
+    # Jobs we haven't applied to yet, in their original order
+    def not_applied(self, jobs):
+        with self._lock:
+            index = self._index()
+            return [job for job in jobs if index.get(job_id(job)) not in APPLIED_STATUSES]
+
+    def get(self, id_):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (id_,)).fetchone()
+        return dict(row) if row else None
+
+    # Any URL of the posting finds it, whatever tracking parameters it carries
+    def find_by_url(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id({"url": url}),)).fetchone()
+            if row is None:
+                row = self._conn.execute("SELECT * FROM jobs WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def by_status(self, status, limit=None):
+        sql = "SELECT * FROM jobs WHERE status = ? COLLATE NOCASE ORDER BY created_at"
+        args = [status]
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, args)]
+
+    def by_company(self, company):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs WHERE company = ?", (company,))
+            return [dict(row) for row in rows]
+
+    def count(self, status=None):
+        with self._lock:
+            if status is None:
+                return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? COLLATE NOCASE", (status,)
+            ).fetchone()[0]
+
+    # All jobs, oldest first, with their extra fields merged in
+    def iter_jobs(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+        for row in rows:
+            yield _with_extra(row)
+
+    def jobs_without_dedupe_keys(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT jobs.* FROM jobs LEFT JOIN dedupe_keys ON dedupe_keys.id = jobs.id "
+                "WHERE dedupe_keys.id IS NULL"
+            ).fetchall()
+        return [_with_extra(row) for row in rows]
+
+    # (id, canonical url, fingerprint, simhash) rows, optionally only for jobs in the given
+    # statuses (compared lowercased); simhashes are kept as hex text because SQLite integers are
+    # signed 64-bit
+    def dedupe_keys(self, statuses=None):
+        sql = "SELECT dedupe_keys.id, dedupe_keys.url, fingerprint, simhash FROM dedupe_keys"
+        args = []
+        if statuses:
+            args = sorted(status.lower() for status in statuses)
+            sql += (
+                " JOIN jobs ON jobs.id = dedupe_keys.id"
+                f" WHERE lower(jobs.status) IN ({','.join('?' * len(args))})"
+            )
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [(id_, url, key, int(value, 16) if value else None) for id_, url, key, value in rows]
+
+    def save_dedupe_keys(self, rows):
+        params = [(id_, url, key, format(value, "x") if value is not None else None) for id_, url, key, value in rows]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dedupe_keys (id, url, fingerprint, simhash) VALUES (?, ?, ?, ?)", params
+            )
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    # Import of the trackers that came before the store. The JSON file is read once. The CSVs
+    # are still appended to (by the results sinks and older scripts), so each open reads only
+    # the rows added since the byte offset it stopped at last time, and an unchanged file costs
+    # one stat. A CSV that shrank was rewritten and is read again from the start. Imports never
+    # move a stored status back (see LEGACY_UPSERT_SQL).
+    def migrate_legacy(self):
+        for path, convert in (
+            (LEGACY_JSON, None),
+            (LEGACY_SUBMITTED_CSV, _submitted_row),
+            (LEGACY_APPLIED_CSV, _applied_row),
+        ):
+            if not os.path.isfile(path):
+                continue
+            key = f"legacy:{os.path.abspath(path)}"
+            marker = self.get_meta(key)
+            try:
+                if convert is None:
+                    if marker is not None:
+                        continue
+                    jobs, end = load_json(path), os.path.getsize(path)
+                else:
+                    offset = _legacy_offset(marker)
+                    size = os.path.getsize(path)
+                    if size == offset:
+                        continue
+                    rows, end = _read_csv_from(path, offset if size > offset else 0)
+                    jobs = [convert(row) for row in rows]
+                added = self.upsert_many(jobs, legacy=True) if jobs else []
+                self.set_meta(key, f"offset:{end}")
+                logger.info(f"Imported {len(added)} new job(s) from {path}")
+            except Exception as e:
+                logger.warning(f"Could not import legacy tracker {path}: {e}")
+
+
+# Byte offset a legacy CSV was read up to. Stores from before offsets were kept recorded
+# "<size>:<mtime>", and the file had been read up to that size.
+def _legacy_offset(marker):
+    if not marker:
+        return 0
+    if marker.startswith("offset:"):
+        return int(marker[len("offset:"):])
+    return int(marker.split(":", 1)[0])
+
+
+# Rows of a CSV after byte `offset` (the header is always read from the top), and the offset
+# to resume from. Only complete lines are taken, so a row still being written waits for the next open.
+def _read_csv_from(path, offset):
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        f.seek(start)
+        data = f.read()
+    data = data[:data.rfind(b"\n") + 1]
+    fieldnames = next(csv.reader([header.decode("utf-8")]), [])
+    rows = csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=fieldnames)
+    return list(rows), start + len(data)
+
+
+def _submitted_row(row):
+    return {
+        "title": row.get("Job Title"),
+        "url": row.get("Link"),
+        "source": row.get("Source"),
+        "status": "applied" if row.get("Applied") == "Yes" else "seen",
+    }
+
+
+def _applied_row(row):
+    return dict(row, status="applied")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# Shared store per database path, so every component in a process uses one connection
+def get_store(path=DEFAULT_DB_PATH):
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = JobStore(path)
+        return store
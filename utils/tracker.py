@@ -0,0 +1,157 @@
+# utils/tracker.py
+import argparse
+import hashlib
+import json
+import logging
+import os
+
+from utils.metrics import metrics
+from utils.storage import get_store
+
+logger = logging.getLogger(__name__)
+
+# Spreadsheet tracker columns (Job_Tracker.ods and the Apply_to_50_Jobs.ods export)
+TRACKER_COLUMNS = ["Date", "Company", "Position", "Status", "Link", "Notes", "Cover_Letter_Path"]
+
+# "auto" exports the .ods at the end of a run when its rows changed; "off" leaves it to
+# `python -m utils.tracker export`
+TRACKER_EXPORT = os.getenv("TRACKER_EXPORT", "auto")
+
+
+# Map tracker rows to job store records and back
+def tracker_row_to_job(row):
+    return {
+        "company": row.get("Company"),
+        "title": row.get("Position"),
+        "status": row.get("Status"),
+        "url": row.get("Link"),
+        "notes": row.get("Notes"),
+        "cover_letter_path": row.get("Cover_Letter_Path"),
+        "date": row.get("Date"),
+        "source": "LinkedIn",
+    }
+
+
+def job_to_tracker_row(job):
+    extra = json.loads(job["extra"]) if job.get("extra") else job
+    return {
+        "Date": extra.get("date") or job["created_at"][:10],
+        "Company": job["company"],
+        "Position": job["title"],
+        "Status": job["status"],
+        "Link": job["url"],
+        "Notes": job["notes"],
+        "Cover_Letter_Path": job["cover_letter_path"],
+    }
+
+
+def read_ods(file_path):
+    import pandas as pd
+
+    df = pd.read_excel(file_path, engine="odf")
+    df = df.astype(object).where(pd.notna(df), None)
+    return df.to_dict("records")
+
+
+def write_ods(rows, file_path):
+    import pandas as pd
+
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    pd.DataFrame(rows, columns=TRACKER_COLUMNS).to_excel(file_path, engine="odf", index=False)
+
+
+def _file_marker(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _rows_digest(rows):
+    return hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# The job store is the tracker's source of truth; spreadsheets are an import/export format.
+# An .ods is only parsed when its size/mtime changed and its content hash differs from the
+# last import, and only written when the exported rows differ from the last export (or the
+# file was edited or removed since).
+class OdsTracker:
+    def __init__(self, store=None):
+        self.store = store or get_store()
+
+    def _meta(self, kind, path):
+        value = self.store.get_meta(f"ods-{kind}:{os.path.abspath(path)}")
+        return json.loads(value) if value else {}
+
+    def _set_meta(self, kind, path, **value):
+        self.store.set_meta(f"ods-{kind}:{os.path.abspath(path)}", json.dumps(value))
+
+    # Import an edited spreadsheet into the store; returns the number of rows read, or None if unchanged
+    def sync_from(self, path):
+        if not os.path.isfile(path):
+            return None
+        seen = self._meta("import", path)
+        marker = _file_marker(path)
+        if seen.get("marker") == marker:
+            return None
+        content = _file_hash(path)
+        if seen.get("hash") == content:
+            self._set_meta("import", path, marker=marker, hash=content)
+            return None
+        rows = read_ods(path)
+        self.store.upsert_many([tracker_row_to_job(row) for row in rows])
+        self._set_meta("import", path, marker=marker, hash=content)
+        logger.info(f"Imported {len(rows)} row(s) from {path}")
+        return len(rows)
+
+    def rows(self, status=None):
+        jobs = self.store.by_status(status) if status else list(self.store.iter_jobs())
+        return [job_to_tracker_row(job) for job in jobs]
+
+    # Write rows to an .ods; returns False when the file already holds exactly these rows
+    def export(self, rows, path, force=False):
+        digest = _rows_digest(rows)
+        last = self._meta("export", path)
+        if (not force and last.get("digest") == digest
+                and os.path.isfile(path) and _file_marker(path) == last.get("marker")):
+            logger.info(f"{path} is up to date")
+            return False
+        with metrics.span("write", os.path.basename(path)):
+            write_ods(rows, path)
+        marker = _file_marker(path)
+        self._set_meta("export", path, digest=digest, marker=marker)
+        # Our own write is not an external edit
+        if self._meta("import", path):
+            self._set_meta("import", path, marker=marker, hash=_file_hash(path))
+        logger.info(f"Exported {len(rows)} row(s) to {path}")
+        return True
+
+
+# python -m utils.tracker import|export PATH: sync a spreadsheet with the job store on demand
+def main():
+    parser = argparse.ArgumentParser(description="Sync an .ods job tracker with the job store")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path", help="Spreadsheet path")
+    parser.add_argument("--status", help="Only export jobs with this status")
+    parser.add_argument("--force", action="store_true", help="Re-read or re-write even if nothing changed")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    tracker = OdsTracker()
+    if args.action == "import":
+        if args.force:
+            tracker.store.set_meta(f"ods-import:{os.path.abspath(args.path)}", "")
+        if tracker.sync_from(args.path) is None:
+            print(f"{args.path} has not changed since the last import")
+    else:
+        tracker.export(tracker.rows(args.status), args.path, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
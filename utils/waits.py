@@ -0,0 +1,157 @@
+# utils/waits.py
+import logging
+import os
+import random
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from utils.ratelimit import get_limiter, is_challenge
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("WAIT_TIMEOUT", "10"))
+POLL_FREQUENCY = 0.1
+
+
+# Per-thread totals of time spent waiting on the DOM, time spent pacing and the active span,
+# so a run can report waiting versus working even with several browser workers
+class WaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._threads = {}
+
+    def _entry(self, start):
+        name = threading.current_thread().name
+        entry = self._threads.get(name)
+        if entry is None:
+            entry = self._threads[name] = {"started": start, "last": start, "waited": 0.0, "paced": 0.0}
+        return entry
+
+    def record(self, kind, start, end):
+        with self._lock:
+            entry = self._entry(start)
+            entry[kind] += end - start
+            entry["last"] = max(entry["last"], end)
+
+    def mark(self):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry(now)
+            entry["last"] = max(entry["last"], now)
+
+    def totals(self):
+        with self._lock:
+            waited = sum(e["waited"] for e in self._threads.values())
+            paced = sum(e["paced"] for e in self._threads.values())
+            active = sum(e["last"] - e["started"] for e in self._threads.values())
+        return {"waited": waited, "paced": paced, "working": max(0.0, active - waited - paced)}
+
+    def summary(self):
+        totals = self.totals()
+        return (
+            f"Browser time: {totals['working']:.1f}s working, {totals['waited']:.1f}s waiting for pages, "
+            f"{totals['paced']:.1f}s pacing"
+        )
+
+    def report(self, log=logger):
+        log.info(self.summary())
+
+
+stats = WaitStats()
+
+
+# Human-like jitter between interactions. The delay is measured from the previous action,
+# so time already spent waiting for the DOM counts towards it instead of being added on top.
+class Pacing:
+    def __init__(self, min_delay=0.0, max_delay=0.0):
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls):
+        return cls(float(os.getenv("PACING_MIN", "0")), float(os.getenv("PACING_MAX", "0")))
+
+    def pause(self):
+        now = time.monotonic()
+        last = getattr(self._local, "last", None)
+        if self.max_delay > 0 and last is not None:
+            due = last + random.uniform(self.min_delay, self.max_delay)
+            if due > now:
+                time.sleep(due - now)
+                stats.record("paced", now, due)
+                now = due
+        self._local.last = now
+
+
+pacing = Pacing.from_env()
+
+
+def wait_for(driver, condition, timeout=DEFAULT_TIMEOUT):
+    start = time.monotonic()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    finally:
+        stats.record("waited", start, time.monotonic())
+
+
+def wait_present(driver, locator, timeout=DEFAULT_TIMEOUT):
+    return wait_for(driver, EC.presence_of_element_located(locator), timeout)
+
+
+def wait_clickable(driver, locator, timeout=DEFAULT_TIMEOUT):
+    return wait_for(driver, EC.element_to_be_clickable(locator), timeout)
+
+
+def wait_all_present(driver, locator, timeout=DEFAULT_TIMEOUT):
+    return wait_for(driver, EC.presence_of_all_elements_located(locator), timeout)
+
+
+def wait_page_ready(driver, timeout=DEFAULT_TIMEOUT):
+    return wait_for(driver, lambda d: d.execute_script("return document.readyState") == "complete", timeout)
+
+
+def wait_url_contains(driver, fragment, timeout=DEFAULT_TIMEOUT):
+    return wait_for(driver, EC.url_contains(fragment), timeout)
+
+
+def wait_url_leaves(driver, fragment, timeout=DEFAULT_TIMEOUT):
+    return wait_for(driver, lambda d: fragment not in d.current_url, timeout)
+
+
+# Navigate and return once the document has loaded. The navigation waits on the site's
+# utils.ratelimit limiter, which then learns from the load time and from landing on a challenge
+# page, and is paced like any other action.
+def open_page(driver, url, timeout=DEFAULT_TIMEOUT):
+    limiter = get_limiter(url)
+    start = time.monotonic()
+    limiter.acquire()
+    allowed = time.monotonic()
+    if allowed > start:
+        stats.record("paced", start, allowed)
+    pacing.pause()
+    loading = time.monotonic()
+    driver.get(url)
+    try:
+        wait_page_ready(driver, timeout)
+    except TimeoutException:
+        logger.debug(f"Page {url} still loading after {timeout}s")
+    limiter.record(latency=time.monotonic() - loading, challenged=is_challenge(driver.current_url))
+    stats.mark()
+
+
+# Wait for an element to become clickable and click it
+def click(driver, locator, timeout=DEFAULT_TIMEOUT):
+    element = wait_clickable(driver, locator, timeout)
+    pacing.pause()
+    element.click()
+    stats.mark()
+    return element